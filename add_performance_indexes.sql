@@ -0,0 +1,36 @@
+-- パフォーマンス改善用のインデックスを追加するSQLスクリプト
+-- app/models.py の __table_args__ と同じ定義です。既存DBに対して一度だけ実行してください
+
+-- 1. 予約一覧（ユーザー別・コーチ別に session_date 降順で取得）
+CREATE INDEX ix_res_user_date ON coaching_reservation (user_id, session_date);
+CREATE INDEX ix_res_coach_date ON coaching_reservation (coach_id, session_date);
+
+-- 2. セクション一覧（セクショングループ別に start_sec 順で取得）
+CREATE INDEX ix_sections_group_start ON swing_sections (section_group_id, start_sec);
+
+-- 3. ユーザー・コーチ一覧（created_at 降順）
+CREATE INDEX ix_users_created_at ON users (created_at);
+CREATE INDEX ix_coaches_created_at ON coaches (created_at);
+
+-- 4. 動画一覧（ユーザー別に upload_date 降順）とピン留め動画の取得
+CREATE INDEX ix_videos_user_upload ON videos (user_id, upload_date);
+CREATE INDEX ix_videos_user_pinned ON videos (user_id, is_pinned);
+
+-- 5. ログイン（email から password_hash と主キーを取得）を索引のみで返すカバリングインデックス
+--    InnoDB の二次インデックスには主キー（user_id / coach_id）が含まれるので列には書かない
+CREATE INDEX ix_users_email_login ON users (email, password_hash);
+CREATE INDEX ix_coaches_email_login ON coaches (email, password_hash);
+
+-- 6. locations.location_id は主キーなので、index=True で作られていた重複インデックスを削除
+DROP INDEX ix_locations_location_id ON locations;
+
+-- 7. 動画検索（user_id + club_type + swing_form の絞り込み）
+CREATE INDEX ix_videos_user_club_form ON videos (user_id, club_type, swing_form);
+
+-- 確認
+SHOW INDEX FROM coaching_reservation;
+SHOW INDEX FROM swing_sections;
+SHOW INDEX FROM videos;
+SHOW INDEX FROM users;
+SHOW INDEX FROM coaches;
+SHOW INDEX FROM locations;
@@ -1,16 +1,43 @@
+import threading
+import time
 from datetime import datetime, timedelta, timezone
-from jose import jwt, JWTError
 from typing import Any, Dict, Optional
+
+import jwt
+from cachetools import TTLCache
+
 from app.core.config import settings
 
+# 署名鍵・アルゴリズムは起動時に一度だけ取り出しておく
+_SECRET = settings.secret_key.encode()
+_ALG = settings.algorithm
+_ALGORITHMS = [_ALG]
+_EXP = timedelta(minutes=settings.access_token_expire_minutes)
+_DECODE_OPTIONS = {"verify_aud": False}
+
+# 検証済みトークン → payload の短命キャッシュ（同じトークンの署名検証を繰り返さない）
+# 期限切れ間近（残り _EXP_MARGIN 秒未満）のトークンはキャッシュしない
+_decoded: TTLCache = TTLCache(maxsize=4096, ttl=60)
+_decoded_lock = threading.Lock()
+_EXP_MARGIN = 5
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=settings.access_token_expire_minutes))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+    expire = datetime.now(timezone.utc) + (expires_delta or _EXP)
+    to_encode["exp"] = expire
+    return jwt.encode(to_encode, _SECRET, algorithm=_ALG)
 
 def decode_access_token(token: str) -> Dict[str, Any]:
-    try:
-        return jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-    except JWTError as e:
-        raise e
+    now = time.time()
+    with _decoded_lock:
+        payload = _decoded.get(token)
+    if payload is not None and payload.get("exp", 0) - now > _EXP_MARGIN:
+        return dict(payload)
+
+    # 不正・期限切れは jwt.PyJWTError のまま呼び出し側へ送出する
+    payload = jwt.decode(token, _SECRET, algorithms=_ALGORITHMS, options=_DECODE_OPTIONS)
+    # exp の無いトークンは毎回検証する
+    if payload.get("exp", 0) - now > _EXP_MARGIN:
+        with _decoded_lock:
+            _decoded[token] = payload
+    return dict(payload)
@@ -1,6 +1,9 @@
 from passlib.context import CryptContext
 
-_pwd = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.config import settings
+
+# bcrypt パッケージ（C 拡張）をバックエンドに使う。コストは環境ごとに設定で調整
+_pwd = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
 
 def get_password_hash(password: str) -> str:
     return _pwd.hash(password)
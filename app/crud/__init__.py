@@ -6,6 +6,33 @@ from .swing_section_crud import SwingSectionCRUD, swing_section_crud
 from .coach_crud import CoachCRUD, coach_crud
 from .user_crud import UserCRUD, user_crud
 
+# モジュール関数（ホットパスではこちらを直接呼ぶ）
+from .video_crud import (
+    create_video, get_video, get_video_with_sections, get_videos_by_user, get_video_cards, search_videos,
+    get_all_videos_with_sections, update_video, delete_video,
+    set_pinned_video, get_pinned_video, mark_video_as_reviewed, video_views,
+)
+from .reservation_crud import (
+    create_reservation, get_reservation, get_reservations_by_user,
+    get_reservations_by_coach, update_reservation,
+)
+from .section_group_crud import (
+    create_section_group, get_section_group, get_section_group_with_sections,
+    add_overall_feedback, add_next_training_menu, update_feedback,
+)
+from .swing_section_crud import (
+    create_section, get_section, get_sections_by_group,
+    update_section, delete_section, add_coach_comment,
+)
+from .coach_crud import (
+    create_coach, get as get_coach, get_by_email as get_coach_by_email, list_coaches,
+)
+from .user_crud import (
+    create_user, create_user_idempotent, get as get_user, get_by_email as get_user_by_email,
+    get_by_line_user_id as get_user_by_line_user_id, list_users,
+    update_partial as update_user_partial,
+)
+
 __all__ = [
     "VideoCRUD", "video_crud",
     "CoachingReservationCRUD", "coaching_reservation_crud",
@@ -13,4 +40,16 @@ __all__ = [
     "SwingSectionCRUD", "swing_section_crud",
     "CoachCRUD", "coach_crud",
     "UserCRUD", "user_crud",
+    "create_video", "get_video", "get_video_with_sections", "get_videos_by_user", "get_video_cards", "search_videos",
+    "get_all_videos_with_sections", "update_video", "delete_video",
+    "set_pinned_video", "get_pinned_video", "mark_video_as_reviewed", "video_views",
+    "create_reservation", "get_reservation", "get_reservations_by_user",
+    "get_reservations_by_coach", "update_reservation",
+    "create_section_group", "get_section_group", "get_section_group_with_sections",
+    "add_overall_feedback", "add_next_training_menu", "update_feedback",
+    "create_section", "get_section", "get_sections_by_group",
+    "update_section", "delete_section", "add_coach_comment",
+    "create_coach", "get_coach", "get_coach_by_email", "list_coaches",
+    "create_user", "create_user_idempotent", "get_user", "get_user_by_email", "get_user_by_line_user_id",
+    "list_users", "update_user_partial",
 ]
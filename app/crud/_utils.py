@@ -0,0 +1,75 @@
+from __future__ import annotations
+import threading
+from typing import Any, Hashable, Optional, Type, TypeVar
+
+from cachetools import TTLCache
+from pydantic import BaseModel
+from sqlalchemy import inspect, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+ModelT = TypeVar("ModelT")
+
+
+def changed_fields(model: BaseModel) -> dict:
+    """明示的に指定され、かつ None でないフィールドだけを 1 パスで dict 化する。
+
+    ネストしたモデル（markup_json 等）も JSON 列に入る形へ変換される。
+    """
+    return model.model_dump(exclude_unset=True, exclude_none=True)
+
+
+async def update_returning(
+    db: AsyncSession, model: Type[ModelT], pk_column: Any, pk_value: Any, values: dict
+) -> Optional[ModelT]:
+    """UPDATE してから更新後の行を返す。
+
+    RETURNING が使える方言 (SQLite / PostgreSQL 等) では 1 往復で済ませ、
+    MySQL のように使えない場合は主キーで 1 回だけ読み直す。
+    commit は呼び出し側 (リクエスト単位のセッション依存) に任せる。
+    """
+    stmt = update(model).where(pk_column == pk_value).values(**values)
+    if db.get_bind().dialect.update_returning:
+        return (await db.execute(stmt.returning(model))).scalar_one_or_none()
+
+    await db.execute(stmt)
+    await db.flush()
+    return await db.get(model, pk_value, populate_existing=True)
+
+
+def detached_copy(obj: ModelT) -> ModelT:
+    """読み込み済みの列属性だけを持つ detached なコピーを作る（キャッシュ保存用）"""
+    state = inspect(obj)
+    clone = state.mapper.class_()
+    for attr in state.mapper.column_attrs:
+        if attr.key in state.dict:
+            setattr(clone, attr.key, state.dict[attr.key])
+    make_transient_to_detached(clone)
+    return clone
+
+
+class ViewCache:
+    """読み取り専用エンドポイントの組み立て済みレスポンスを持つプロセス内 TTL キャッシュ。
+
+    書き込む側の CRUD が clear() で丸ごと捨てる。読み込み中に clear() を挟んだ結果は put しない
+    （generation を読み込み前に控えておく）。ワーカー間では共有しないので、他ワーカーの古い値は TTL で切れる。
+    """
+
+    def __init__(self, maxsize: int = 2048, ttl: float = 5) -> None:
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            return self._cache.get(key)
+
+    def put(self, key: Hashable, value: Any, generation: int) -> None:
+        with self._lock:
+            if generation == self.generation:
+                self._cache[key] = value
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._cache.clear()
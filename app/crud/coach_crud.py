@@ -2,56 +2,63 @@ from __future__ import annotations
 from typing import List, Optional
 from uuid import UUID
 
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import lambda_stmt, select
 
 from app.models import Coach
 from app.schemas.coach import CoachCreate
 from app.core.security import get_password_hash
 
+async def create_coach(db: AsyncSession, coach_in: CoachCreate) -> Coach:
+    coach = Coach(
+        usertype=coach_in.usertype or "coach",
+        coachname=coach_in.coachname,
+        email=coach_in.email,
+        birthday=coach_in.birthday,
+        sex=coach_in.sex,
+        SNS_handle_instagram=coach_in.SNS_handle_instagram,
+        SNS_handle_X=coach_in.SNS_handle_X,
+        SNS_handle_youtube=coach_in.SNS_handle_youtube,
+        SNS_handle_facebook=coach_in.SNS_handle_facebook,
+        SNS_handle_tiktok=coach_in.SNS_handle_tiktok,
+        password_hash=await run_in_threadpool(get_password_hash, coach_in.password),  # bcrypt はイベントループ外で
+        line_user_id=coach_in.line_user_id,
+        profile_picture_url=coach_in.profile_picture_url,
+        bio=coach_in.bio,
+        hourly_rate=coach_in.hourly_rate,
+        location_id=coach_in.location_id,
+    )
+    db.add(coach)
+    await db.flush()
+    return coach
+
+
+async def get(db: AsyncSession, coach_id: UUID) -> Optional[Coach]:
+    return await db.get(Coach, coach_id)
+
+
+async def get_by_email(db: AsyncSession, email: str) -> Optional[Coach]:
+    stmt = lambda_stmt(lambda: select(Coach))
+    stmt += lambda s: s.where(Coach.email == email)
+    return (await db.execute(stmt)).scalar_one_or_none()
+
+
+async def list_coaches(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Coach]:
+    res = await db.execute(
+        select(Coach).order_by(Coach.created_at.desc()).offset(skip).limit(limit)
+    )
+    return res.scalars().all()
+
 
 class CoachCRUD:
-    @staticmethod
-    def create_coach(db: Session, coach_in: CoachCreate) -> Coach:
-        coach = Coach(
-            usertype=coach_in.usertype or "coach",
-            coachname=coach_in.coachname,
-            email=coach_in.email,
-            birthday=coach_in.birthday,
-            sex=coach_in.sex,
-            SNS_handle_instagram=coach_in.SNS_handle_instagram,
-            SNS_handle_X=coach_in.SNS_handle_X,
-            SNS_handle_youtube=coach_in.SNS_handle_youtube,
-            SNS_handle_facebook=coach_in.SNS_handle_facebook,
-            SNS_handle_tiktok=coach_in.SNS_handle_tiktok,
-            password_hash=get_password_hash(coach_in.password),
-            line_user_id=coach_in.line_user_id,
-            profile_picture_url=coach_in.profile_picture_url,
-            bio=coach_in.bio,
-            hourly_rate=coach_in.hourly_rate,
-            location_id=coach_in.location_id,
-        )
-        db.add(coach)
-        db.commit()
-        db.refresh(coach)
-        return coach
-
-    @staticmethod
-    def get(db: Session, coach_id: UUID) -> Optional[Coach]:
-        res = db.execute(select(Coach).where(Coach.coach_id == coach_id))
-        return res.scalar_one_or_none()
-
-    @staticmethod
-    def get_by_email(db: Session, email: str) -> Optional[Coach]:
-        res = db.execute(select(Coach).where(Coach.email == email))
-        return res.scalar_one_or_none()
-
-    @staticmethod
-    def list(db: Session, skip: int = 0, limit: int = 100) -> List[Coach]:
-        res = db.execute(
-            select(Coach).order_by(Coach.created_at.desc()).offset(skip).limit(limit)
-        )
-        return res.scalars().all()
+    """後方互換用の名前空間（既存の coach_crud.xxx(...) 呼び出し向け）"""
+    __slots__ = ()
+
+    create_coach = staticmethod(create_coach)
+    get = staticmethod(get)
+    get_by_email = staticmethod(get_by_email)
+    list = staticmethod(list_coaches)
 
 
 coach_crud = CoachCRUD()
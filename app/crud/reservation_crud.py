@@ -2,60 +2,69 @@ from __future__ import annotations
 from typing import List, Optional
 from uuid import UUID
 
-from sqlalchemy.orm import Session
-from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 
+from app.crud._utils import changed_fields, update_returning
 from app.models import CoachingReservation
 from app.schemas.reservation import CoachingReservationCreate, CoachingReservationUpdate
 
 
+async def create_reservation(db: AsyncSession, reservation: CoachingReservationCreate) -> CoachingReservation:
+    db_reservation = CoachingReservation(**changed_fields(reservation))
+    db.add(db_reservation)
+    # session_id はクライアント側採番、status / payment_status は Python 側の既定値で
+    # flush 時に埋まる。レスポンスはサーバー既定値の列を使わないので refresh は不要
+    await db.flush()
+    return db_reservation
+
+
+async def get_reservation(db: AsyncSession, session_id: UUID) -> Optional[CoachingReservation]:
+    """主キー 1 回で取得する。CoachingReservation はリレーションを持たず、
+    CoachingReservationResponse も列だけなので、coach / video を JOIN で先読みする必要はない"""
+    return await db.get(CoachingReservation, session_id)
+
+
+async def get_reservations_by_user(db: AsyncSession, user_id: UUID) -> List[CoachingReservation]:
+    res = await db.execute(
+        select(CoachingReservation)
+        .where(CoachingReservation.user_id == user_id)
+        .order_by(CoachingReservation.session_date.desc())
+    )
+    return res.scalars().all()
+
+
+async def get_reservations_by_coach(db: AsyncSession, coach_id: UUID) -> List[CoachingReservation]:
+    res = await db.execute(
+        select(CoachingReservation)
+        .where(CoachingReservation.coach_id == coach_id)
+        .order_by(CoachingReservation.session_date.desc())
+    )
+    return res.scalars().all()
+
+
+async def update_reservation(
+    db: AsyncSession, session_id: UUID, reservation_update: CoachingReservationUpdate
+) -> Optional[CoachingReservation]:
+    update_data = changed_fields(reservation_update)
+
+    if not update_data:
+        return await get_reservation(db, session_id)
+
+    return await update_returning(
+        db, CoachingReservation, CoachingReservation.session_id, session_id, update_data
+    )
+
+
 class CoachingReservationCRUD:
-    @staticmethod
-    def create_reservation(db: Session, reservation: CoachingReservationCreate) -> CoachingReservation:
-        db_reservation = CoachingReservation(**reservation.model_dump(exclude_unset=True))
-        db.add(db_reservation)
-        db.commit()
-        db.refresh(db_reservation)
-        return db_reservation
-
-    @staticmethod
-    def get_reservation(db: Session, session_id: UUID) -> Optional[CoachingReservation]:
-        res = db.execute(
-            select(CoachingReservation).where(CoachingReservation.session_id == session_id)
-        )
-        return res.scalar_one_or_none()
-
-    @staticmethod
-    def get_reservations_by_user(db: Session, user_id: UUID) -> List[CoachingReservation]:
-        res = db.execute(
-            select(CoachingReservation)
-            .where(CoachingReservation.user_id == user_id)
-            .order_by(CoachingReservation.session_date.desc())
-        )
-        return res.scalars().all()
-
-    @staticmethod
-    def get_reservations_by_coach(db: Session, coach_id: UUID) -> List[CoachingReservation]:
-        res = db.execute(
-            select(CoachingReservation)
-            .where(CoachingReservation.coach_id == coach_id)
-            .order_by(CoachingReservation.session_date.desc())
-        )
-        return res.scalars().all()
-
-    @staticmethod
-    def update_reservation(
-        db: Session, session_id: UUID, reservation_update: CoachingReservationUpdate
-    ) -> Optional[CoachingReservation]:
-        update_data = {k: v for k, v in reservation_update.model_dump(exclude_unset=True).items() if v is not None}
-
-        if update_data:
-            db.execute(
-                update(CoachingReservation).where(CoachingReservation.session_id == session_id).values(**update_data)
-            )
-            db.commit()
-
-        return CoachingReservationCRUD.get_reservation(db, session_id)
+    """後方互換用の名前空間（既存の reservation_crud.xxx(...) 呼び出し向け）"""
+    __slots__ = ()
+
+    create_reservation = staticmethod(create_reservation)
+    get_reservation = staticmethod(get_reservation)
+    get_reservations_by_user = staticmethod(get_reservations_by_user)
+    get_reservations_by_coach = staticmethod(get_reservations_by_coach)
+    update_reservation = staticmethod(update_reservation)
 
 
 coaching_reservation_crud = CoachingReservationCRUD()
@@ -2,78 +2,101 @@ from __future__ import annotations
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy.orm import Session
-from sqlalchemy import select, update
-from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
 
+from app.crud._utils import changed_fields, update_returning
+from app.crud.video_crud import video_views
 from app.models import SectionGroup
+from app.utils.timezone import now_utc
 from app.schemas.section import SectionGroupCreate
 
 
+async def create_section_group(db: AsyncSession, section_group: SectionGroupCreate) -> SectionGroup:
+    db_section_group = SectionGroup(**changed_fields(section_group))
+    db.add(db_section_group)
+    # created_at は Python 側の既定値で埋まるので refresh は不要
+    await db.flush()
+    video_views.clear()
+    return db_section_group
+
+
+async def get_section_group(db: AsyncSession, section_group_id: UUID) -> Optional[SectionGroup]:
+    return await db.get(SectionGroup, section_group_id)
+
+
+async def get_section_group_with_sections(db: AsyncSession, section_group_id: UUID) -> Optional[SectionGroup]:
+    res = await db.execute(
+        select(SectionGroup)
+        .options(joinedload(SectionGroup.sections))  # 子は数件程度なので JOIN 1 回で取る
+        .where(SectionGroup.section_group_id == section_group_id)
+    )
+    return res.scalars().unique().one_or_none()
+
+
+async def add_overall_feedback(
+    db: AsyncSession,
+    section_group_id: UUID,
+    overall_feedback: str,
+    overall_feedback_summary: str,
+) -> Optional[SectionGroup]:
+    video_views.clear()
+    return await update_returning(
+        db,
+        SectionGroup,
+        SectionGroup.section_group_id,
+        section_group_id,
+        {
+            "overall_feedback": overall_feedback,
+            "overall_feedback_summary": overall_feedback_summary,
+            "feedback_created_at": now_utc(),
+        },
+    )
+
+
+async def add_next_training_menu(
+    db: AsyncSession,
+    section_group_id: UUID,
+    next_training_menu: str,
+    next_training_menu_summary: str,
+) -> Optional[SectionGroup]:
+    video_views.clear()
+    return await update_returning(
+        db,
+        SectionGroup,
+        SectionGroup.section_group_id,
+        section_group_id,
+        {
+            "next_training_menu": next_training_menu,
+            "next_training_menu_summary": next_training_menu_summary,
+            "feedback_created_at": now_utc(),
+        },
+    )
+
+
+async def update_feedback(db: AsyncSession, section_group_id: UUID, values: dict) -> Optional[SectionGroup]:
+    """総評・練習メニューをまとめて更新する（feedback_created_at は add_* と同じく Python 側の UTC で入れる）"""
+    video_views.clear()
+    return await update_returning(
+        db,
+        SectionGroup,
+        SectionGroup.section_group_id,
+        section_group_id,
+        {**values, "feedback_created_at": now_utc()},
+    )
+
+
 class SectionGroupCRUD:
-    @staticmethod
-    def create_section_group(db: Session, section_group: SectionGroupCreate) -> SectionGroup:
-        db_section_group = SectionGroup(**section_group.model_dump(exclude_unset=True))
-        db.add(db_section_group)
-        db.commit()
-        db.refresh(db_section_group)
-        return db_section_group
-
-    @staticmethod
-    def get_section_group(db: Session, section_group_id: UUID) -> Optional[SectionGroup]:
-        res = db.execute(select(SectionGroup).where(SectionGroup.section_group_id == section_group_id))
-        return res.scalar_one_or_none()
-
-    @staticmethod
-    def get_section_group_with_sections(db: Session, section_group_id: UUID) -> Optional[SectionGroup]:
-        res = db.execute(
-            select(SectionGroup)
-            .options(selectinload(SectionGroup.sections))
-            .where(SectionGroup.section_group_id == section_group_id)
-        )
-        return res.scalars().unique().one_or_none()
-
-    @staticmethod
-    def add_overall_feedback(
-        db: Session,
-        section_group_id: UUID,
-        overall_feedback: str,
-        overall_feedback_summary: str,
-    ) -> Optional[SectionGroup]:
-        from datetime import datetime, timezone
-
-        db.execute(
-            update(SectionGroup)
-            .where(SectionGroup.section_group_id == section_group_id)
-            .values(
-                overall_feedback=overall_feedback,
-                overall_feedback_summary=overall_feedback_summary,
-                feedback_created_at=datetime.now(timezone.utc),
-            )
-        )
-        db.commit()
-        return SectionGroupCRUD.get_section_group(db, section_group_id)
-
-    @staticmethod
-    def add_next_training_menu(
-        db: Session,
-        section_group_id: UUID,
-        next_training_menu: str,
-        next_training_menu_summary: str,
-    ) -> Optional[SectionGroup]:
-        from datetime import datetime, timezone
-
-        db.execute(
-            update(SectionGroup)
-            .where(SectionGroup.section_group_id == section_group_id)
-            .values(
-                next_training_menu=next_training_menu,
-                next_training_menu_summary=next_training_menu_summary,
-                feedback_created_at=datetime.now(timezone.utc),
-            )
-        )
-        db.commit()
-        return SectionGroupCRUD.get_section_group(db, section_group_id)
+    """後方互換用の名前空間（既存の section_group_crud.xxx(...) 呼び出し向け）"""
+    __slots__ = ()
+
+    create_section_group = staticmethod(create_section_group)
+    get_section_group = staticmethod(get_section_group)
+    get_section_group_with_sections = staticmethod(get_section_group_with_sections)
+    add_overall_feedback = staticmethod(add_overall_feedback)
+    add_next_training_menu = staticmethod(add_next_training_menu)
+    update_feedback = staticmethod(update_feedback)
 
 
 section_group_crud = SectionGroupCRUD()
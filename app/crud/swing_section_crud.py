@@ -2,61 +2,72 @@ from __future__ import annotations
 from typing import List, Optional
 from uuid import UUID
 
-from sqlalchemy.orm import Session
-from sqlalchemy import select, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
 
+from app.crud._utils import changed_fields, update_returning
+from app.crud.video_crud import video_views
 from app.models import SwingSection
 from app.schemas.section import SwingSectionCreate, SwingSectionUpdate
 
 
+async def create_section(db: AsyncSession, section: SwingSectionCreate) -> SwingSection:
+    db_section = SwingSection(**changed_fields(section))
+    db.add(db_section)
+    await db.flush()
+    video_views.clear()
+    await db.refresh(db_section, attribute_names=["created_at"])
+    return db_section
+
+
+async def get_section(db: AsyncSession, section_id: UUID) -> Optional[SwingSection]:
+    return await db.get(SwingSection, section_id)
+
+
+async def get_sections_by_group(db: AsyncSession, section_group_id: UUID) -> List[SwingSection]:
+    res = await db.execute(
+        select(SwingSection).where(SwingSection.section_group_id == section_group_id).order_by(SwingSection.start_sec)
+    )
+    return res.scalars().all()
+
+
+async def update_section(db: AsyncSession, section_id: UUID, section_update: SwingSectionUpdate) -> Optional[SwingSection]:
+    update_data = changed_fields(section_update)
+
+    if not update_data:
+        return await get_section(db, section_id)
+
+    video_views.clear()
+    return await update_returning(db, SwingSection, SwingSection.section_id, section_id, update_data)
+
+
+async def delete_section(db: AsyncSession, section_id: UUID) -> bool:
+    video_views.clear()
+    res = await db.execute(delete(SwingSection).where(SwingSection.section_id == section_id))
+    return (res.rowcount or 0) > 0
+
+
+async def add_coach_comment(db: AsyncSession, section_id: UUID, comment: str, summary: str) -> Optional[SwingSection]:
+    video_views.clear()
+    return await update_returning(
+        db,
+        SwingSection,
+        SwingSection.section_id,
+        section_id,
+        {"coach_comment": comment, "coach_comment_summary": summary},
+    )
+
+
 class SwingSectionCRUD:
-    @staticmethod
-    def create_section(db: Session, section: SwingSectionCreate) -> SwingSection:
-        db_section = SwingSection(**section.model_dump(exclude_unset=True))
-        db.add(db_section)
-        db.commit()
-        db.refresh(db_section)
-        return db_section
-
-    @staticmethod
-    def get_section(db: Session, section_id: UUID) -> Optional[SwingSection]:
-        res = db.execute(select(SwingSection).where(SwingSection.section_id == section_id))
-        return res.scalar_one_or_none()
-
-    @staticmethod
-    def get_sections_by_group(db: Session, section_group_id: UUID) -> List[SwingSection]:
-        res = db.execute(
-            select(SwingSection).where(SwingSection.section_group_id == section_group_id).order_by(SwingSection.start_sec)
-        )
-        return res.scalars().all()
-
-    @staticmethod
-    def update_section(db: Session, section_id: UUID, section_update: SwingSectionUpdate) -> Optional[SwingSection]:
-        update_data = {k: v for k, v in section_update.model_dump(exclude_unset=True).items() if v is not None}
-
-        if update_data:
-            db.execute(
-                update(SwingSection).where(SwingSection.section_id == section_id).values(**update_data)
-            )
-            db.commit()
-
-        return SwingSectionCRUD.get_section(db, section_id)
-
-    @staticmethod
-    def delete_section(db: Session, section_id: UUID) -> bool:
-        res = db.execute(delete(SwingSection).where(SwingSection.section_id == section_id))
-        db.commit()
-        return (res.rowcount or 0) > 0
-
-    @staticmethod
-    def add_coach_comment(db: Session, section_id: UUID, comment: str, summary: str) -> Optional[SwingSection]:
-        db.execute(
-            update(SwingSection)
-            .where(SwingSection.section_id == section_id)
-            .values(coach_comment=comment, coach_comment_summary=summary)
-        )
-        db.commit()
-        return SwingSectionCRUD.get_section(db, section_id)
+    """後方互換用の名前空間（既存の swing_section_crud.xxx(...) 呼び出し向け）"""
+    __slots__ = ()
+
+    create_section = staticmethod(create_section)
+    get_section = staticmethod(get_section)
+    get_sections_by_group = staticmethod(get_sections_by_group)
+    update_section = staticmethod(update_section)
+    delete_section = staticmethod(delete_section)
+    add_coach_comment = staticmethod(add_coach_comment)
 
 
 swing_section_crud = SwingSectionCRUD()
@@ -1,74 +1,139 @@
 from __future__ import annotations
 from typing import Optional, List
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlalchemy.orm import Session
-from sqlalchemy import select, update
+from cachetools import TTLCache
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert, lambda_stmt, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
+from app.crud._utils import detached_copy, update_returning
 from app.models import User
 from app.schemas.user import UserRegister
 from app.core.security import get_password_hash
 
+# user_id → User（detached なコピー）の短命キャッシュ（ワーカープロセス単位。動画レスポンスに載せる投稿者情報用）
+_user_cache: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+
+
+def invalidate_cache(user_id: UUID) -> None:
+    _user_cache.pop(user_id, None)
+
+
+async def create_user(db: AsyncSession, payload: UserRegister) -> User:
+    user = User(
+        username=payload.username,
+        email=payload.email,
+        usertype=payload.usertype or "user",
+        password_hash=await run_in_threadpool(get_password_hash, payload.password),  # bcrypt はイベントループ外で
+        birthday=payload.birthday,
+        line_user_id=payload.line_user_id,
+        profile_picture_url=payload.profile_picture_url,
+        bio=payload.bio,
+        golf_score_ave=payload.golf_score_ave,
+        golf_exp=payload.golf_exp,
+        zip_code=payload.zip_code,
+        state=payload.state,
+        address1=payload.address1,
+        address2=payload.address2,
+        sport_exp=payload.sport_exp,
+        industry=payload.industry,
+        job_title=payload.job_title,
+        position=payload.position,
+    )
+    db.add(user)
+    await db.flush()
+    return user
+
+
+async def _user_values(payload: UserRegister, **extra) -> dict:
+    data = payload.model_dump(exclude_unset=True, exclude={"password"})
+    data.update(extra)
+    data["user_id"] = uuid4()
+    data["password_hash"] = await run_in_threadpool(get_password_hash, payload.password)
+    return data
+
+
+async def create_user_idempotent(db: AsyncSession, payload: UserRegister, **extra) -> UUID:
+    """email の一意制約を使って冪等に登録し、その email の user_id を返す（同時リクエストでも重複・例外にならない）。
+
+    INSERT 1 回で済ませ、競合して 1 行も入らなかったときだけ勝った側の行を email で引き直す。
+    既存行の確認は呼び出し側（LINE webhook の line_user_id 検索）が済ませている前提で、ここでは事前 SELECT しない。
+    """
+    data = await _user_values(payload, **extra)
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        # INSERT IGNORE：重複行は書き込まず affected rows 0 になる
+        # （ON DUPLICATE KEY UPDATE は CLIENT_FOUND_ROWS 下で新規挿入と同じ 1 を返すので区別できない）
+        stmt = insert(User).values(**data).prefix_with("IGNORE", dialect="mysql")
+    elif dialect in ("postgresql", "sqlite"):
+        insert_ = postgresql_insert if dialect == "postgresql" else sqlite_insert
+        stmt = insert_(User).values(**data).on_conflict_do_nothing(index_elements=[User.email])
+    else:
+        stmt = insert(User).values(**data)
+    if (await db.execute(stmt)).rowcount:
+        return data["user_id"]
+    return (await db.execute(select(User.user_id).where(User.email == payload.email))).scalar_one()
+
+
+async def get(db: AsyncSession, user_id: UUID) -> Optional[User]:
+    return await db.get(User, user_id)
+
+
+async def get_cached(db: AsyncSession, user_id: UUID) -> Optional[User]:
+    """主キーで取得（短命キャッシュ経由。動画レスポンスに載せる投稿者情報など向け）"""
+    cached = _user_cache.get(user_id)
+    if cached is not None:
+        return await db.merge(cached, load=False)
+    user = await db.get(User, user_id)
+    if user is not None:
+        _user_cache[user_id] = detached_copy(user)
+    return user
+
+
+async def get_by_email(db: AsyncSession, email: str) -> Optional[User]:
+    stmt = lambda_stmt(lambda: select(User))
+    stmt += lambda s: s.where(User.email == email)
+    return (await db.execute(stmt)).scalar_one_or_none()
+
+
+async def get_by_line_user_id(db: AsyncSession, line_user_id: str) -> Optional[User]:
+    if not line_user_id:
+        return None
+    stmt = lambda_stmt(lambda: select(User))
+    stmt += lambda s: s.where(User.line_user_id == line_user_id)
+    return (await db.execute(stmt)).scalar_one_or_none()
+
+
+async def list_users(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[User]:
+    res = await db.execute(
+        select(User).order_by(User.created_at.desc()).offset(skip).limit(limit)
+    )
+    return res.scalars().all()
+
+
+async def update_partial(db: AsyncSession, user_id: UUID, data: dict) -> Optional[User]:
+    if not data:
+        return await get(db, user_id)
+    invalidate_cache(user_id)
+    return await update_returning(db, User, User.user_id, user_id, data)
+
 
 class UserCRUD:
-    @staticmethod
-    def create_user(db: Session, payload: UserRegister) -> User:
-        user = User(
-            username=payload.username,
-            email=payload.email,
-            usertype=payload.usertype or "user",
-            password_hash=get_password_hash(payload.password),
-            birthday=payload.birthday,
-            line_user_id=payload.line_user_id,
-            profile_picture_url=payload.profile_picture_url,
-            bio=payload.bio,
-            golf_score_ave=payload.golf_score_ave,
-            golf_exp=payload.golf_exp,
-            zip_code=payload.zip_code,
-            state=payload.state,
-            address1=payload.address1,
-            address2=payload.address2,
-            sport_exp=payload.sport_exp,
-            industry=payload.industry,
-            job_title=payload.job_title,
-            position=payload.position,
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-        return user
-
-    @staticmethod
-    def get(db: Session, user_id: UUID) -> Optional[User]:
-        res = db.execute(select(User).where(User.user_id == user_id))
-        return res.scalar_one_or_none()
-
-    @staticmethod
-    def get_by_email(db: Session, email: str) -> Optional[User]:
-        res = db.execute(select(User).where(User.email == email))
-        return res.scalar_one_or_none()
-
-    @staticmethod
-    def get_by_line_user_id(db: Session, line_user_id: str) -> Optional[User]:
-        if not line_user_id:
-            return None
-        res = db.execute(select(User).where(User.line_user_id == line_user_id))
-        return res.scalar_one_or_none()
-
-    @staticmethod
-    def list(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
-        res = db.execute(
-            select(User).order_by(User.created_at.desc()).offset(skip).limit(limit)
-        )
-        return res.scalars().all()
-
-    @staticmethod
-    def update_partial(db: Session, user_id: UUID, data: dict) -> Optional[User]:
-        if not data:
-            return UserCRUD.get(db, user_id)
-        db.execute(update(User).where(User.user_id == user_id).values(**data))
-        db.commit()
-        return UserCRUD.get(db, user_id)
+    """後方互換用の名前空間（既存の user_crud.xxx(...) 呼び出し向け）"""
+    __slots__ = ()
+
+    create_user = staticmethod(create_user)
+    create_user_idempotent = staticmethod(create_user_idempotent)
+    get = staticmethod(get)
+    get_cached = staticmethod(get_cached)
+    get_by_email = staticmethod(get_by_email)
+    get_by_line_user_id = staticmethod(get_by_line_user_id)
+    list = staticmethod(list_users)
+    update_partial = staticmethod(update_partial)
+    invalidate_cache = staticmethod(invalidate_cache)
 
 
 user_crud = UserCRUD()
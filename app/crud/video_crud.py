@@ -2,129 +2,244 @@ from __future__ import annotations
 from typing import List, Optional
 from uuid import UUID
 
-from sqlalchemy.orm import Session
-from sqlalchemy import select, update, delete
-from sqlalchemy.orm import selectinload
-
-from app.models import Video, SectionGroup
+from cachetools import TTLCache
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, exists, inspect, or_, select, update
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.crud._utils import ViewCache, changed_fields, detached_copy, update_returning
+from app.crud.user_crud import get_cached as get_user_cached
+from app.models import Video, SectionGroup, User
 from app.schemas.video import VideoCreate, VideoUpdate
 
 
-def _normalize_video_update_payload(data: dict) -> dict:
-    """相手側のキー名が来ても内部名へ正規化（保険）"""
-    if "swing_type" in data and "swing_form" not in data:
-        data["swing_form"] = data.pop("swing_type")
-    if "description" in data and "swing_note" not in data:
-        data["swing_note"] = data.pop("description")
-    return data
-
-
-class VideoCRUD:
-    # ---- 作成 ----
-    @staticmethod
-    def create_video(db: Session, video: VideoCreate) -> Video:
-        db_video = Video(**video.model_dump(exclude_unset=True))
-        db_video.is_pinned = False
-        db_video.is_reviewed = False
-        db.add(db_video)
-        db.commit()
-        db.refresh(db_video)
-        return db_video
-
-    # ---- 取得 ----
-    @staticmethod
-    def get_video(db: Session, video_id: UUID) -> Optional[Video]:
-        res = db.execute(select(Video).where(Video.video_id == video_id))
-        return res.scalar_one_or_none()
-
-    @staticmethod
-    def get_video_with_sections(db: Session, video_id: UUID) -> Optional[Video]:
-        res = db.execute(
-            select(Video)
-            .options(selectinload(Video.section_groups).selectinload(SectionGroup.sections))
-            .where(Video.video_id == video_id)
-        )
-        return res.scalars().unique().one_or_none()
-
-    @staticmethod
-    def get_videos_by_user(
-        db: Session, user_id: UUID, skip: int = 0, limit: int = 100
-    ) -> List[Video]:
-        res = db.execute(
-            select(Video)
-            .where(Video.user_id == user_id)
-            .order_by(Video.upload_date.desc())
-            .offset(skip)
-            .limit(limit)
+# ("id", video_id) → Video、("pinned", user_id) → video_id の短命キャッシュ（ワーカープロセス単位）。
+# Video は列だけを持つ detached なコピーを入れ、取り出しは merge(load=False)（SQL なし）で呼び出し側のセッションへ戻す。
+# 書き込む関数が pop する。commit までの間に他リクエストが読み直した古い行は最大 TTL（30 秒）残りうる
+_video_cache: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+
+# 動画まわりの GET（/with-sections・/feedback-summary・一覧）の組み立て済みレスポンス。
+# videos / section_groups / swing_sections を書き込む CRUD 関数が clear() する。
+# ワーカープロセス単位なので他ワーカーでは最大 TTL（5 秒）古い応答が返りうる（共有バックエンドは置かない）
+video_views = ViewCache(maxsize=2048, ttl=5)
+
+
+# ---- 作成 ----
+async def create_video(db: AsyncSession, video: VideoCreate) -> Video:
+    db_video = Video(**video.model_dump(exclude_unset=True))
+    db_video.is_pinned = False
+    db_video.is_reviewed = False
+    db.add(db_video)
+    await db.flush()
+    video_views.clear()
+    # 日時列は Python 側の既定値で埋まっているので行の読み直しはしない。
+    # VideoResponse が user も参照するため、identity map（なければ主キー 1 回）から取って載せておく
+    # （AsyncSession では属性アクセス時の遅延ロードができない）
+    set_committed_value(db_video, "user", await db.get(User, db_video.user_id))
+    return db_video
+
+
+# ---- 取得 ----
+async def get_video(db: AsyncSession, video_id: UUID) -> Optional[Video]:
+    cached = _video_cache.get(("id", video_id))
+    if cached is not None:
+        video = await db.merge(cached, load=False)
+        # キャッシュは列のみ保持するので、VideoResponse 用の user はユーザーキャッシュから載せる
+        if "user" in inspect(video).unloaded:
+            set_committed_value(video, "user", await get_user_cached(db, video.user_id))
+        return video
+    res = await db.execute(
+        select(Video).options(joinedload(Video.user)).where(Video.video_id == video_id)
+    )
+    video = res.scalar_one_or_none()
+    if video is not None:
+        _video_cache[("id", video_id)] = detached_copy(video)
+    return video
+
+
+async def get_video_with_sections(
+    db: AsyncSession, video_id: UUID, *, with_user: bool = True
+) -> Optional[Video]:
+    """section_groups → sections を selectinload で先読みする（with_user=False なら users の JOIN も省く）"""
+    options = [selectinload(Video.section_groups).selectinload(SectionGroup.sections)]
+    if with_user:
+        options.append(joinedload(Video.user))
+    res = await db.execute(
+        select(Video)
+        .options(
+            *options,
+            # 上で指定していないリレーション（sessions 等）は遅延ロードさせず即エラーにする
+            raiseload("*", sql_only=True),
         )
-        return res.scalars().all()
-
-    @staticmethod
-    def get_all_videos_with_sections(
-        db: Session, skip: int = 0, limit: int = 100
-    ) -> List[Video]:
-        res = db.execute(
-            select(Video)
-            .options(
-                selectinload(Video.section_groups).selectinload(SectionGroup.sections),
-                selectinload(Video.user)
-            )
-            .order_by(Video.upload_date.desc())
-            .offset(skip)
-            .limit(limit)
+        .where(Video.video_id == video_id)
+    )
+    return res.scalars().unique().one_or_none()
+
+
+async def get_videos_by_user(
+    db: AsyncSession, user_id: UUID, skip: int = 0, limit: int = 100,
+    *, with_section_groups: bool = False,
+) -> List[Video]:
+    """with_section_groups=True でフィードバック有無の判定に使う section_groups も先読みする"""
+    stmt = select(Video)
+    if with_section_groups:
+        stmt = stmt.options(selectinload(Video.section_groups))
+    res = await db.execute(
+        stmt
+        .where(Video.user_id == user_id)
+        .order_by(Video.upload_date.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    videos = res.scalars().all()
+    # 投稿者は全件同じなので、selectinload（IN 句の 2 本目の SELECT）ではなくユーザーキャッシュから 1 回だけ取って載せる
+    if videos:
+        user = await get_user_cached(db, user_id)
+        for video in videos:
+            set_committed_value(video, "user", user)
+    return videos
+
+
+async def get_video_cards(db: AsyncSession, user_id: UUID, limit: int = 100) -> list:
+    """ホーム画面の一覧カード用：必要な列とフィードバック有無だけを新しい順に返す（ORM オブジェクトは作らない）"""
+    # フィードバック有無 = section_groups が 1 件でもあるか（相関 EXISTS サブクエリ）
+    has_feedback = exists().where(SectionGroup.video_id == Video.video_id).label("has_feedback")
+    res = await db.execute(
+        select(
+            Video.video_id, Video.thumbnail_url, Video.upload_date,
+            Video.club_type, Video.swing_form, has_feedback,
         )
-        return res.scalars().unique().all()
-
-    # ---- 更新 ----
-    @staticmethod
-    def update_video(db: Session, video_id: UUID, video_update: VideoUpdate) -> Optional[Video]:
-        update_data = {
-            k: v for k, v in video_update.model_dump(exclude_unset=True).items() if v is not None
-        }
-        update_data = _normalize_video_update_payload(update_data)
-
-        if update_data:
-            db.execute(
-                update(Video).where(Video.video_id == video_id).values(**update_data)
-            )
-            db.commit()
-
-        return VideoCRUD.get_video(db, video_id)
-
-    # ---- 削除 ----
-    @staticmethod
-    def delete_video(db: Session, video_id: UUID) -> bool:
-        res = db.execute(delete(Video).where(Video.video_id == video_id))
-        db.commit()
-        return (res.rowcount or 0) > 0
-
-    # ---- ピン留め ----
-    @staticmethod
-    def set_pinned_video(db: Session, user_id: UUID, video_id: UUID):
-        # 既存のピンを外す
-        db.execute(
-            update(Video).where(Video.user_id == user_id).values(is_pinned=False)
+        .where(Video.user_id == user_id)
+        .order_by(Video.upload_date.desc())
+        .limit(limit)
+    )
+    return res.all()
+
+
+async def search_videos(
+    db: AsyncSession,
+    user_id: UUID,
+    club_type: Optional[str] = None,
+    swing_form: Optional[str] = None,
+    has_feedback: Optional[bool] = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> List[Video]:
+    """ユーザーの動画を条件で絞り込む（絞り込みは全て SQL 側で行い、一致した行だけを受け取る）"""
+    stmt = select(Video).options(selectinload(Video.section_groups)).where(Video.user_id == user_id)
+    if club_type:
+        stmt = stmt.where(Video.club_type == club_type)
+    if swing_form:
+        stmt = stmt.where(Video.swing_form == swing_form)
+    if has_feedback is not None:
+        # フィードバック有無 = section_groups が 1 件でもあるか（相関 EXISTS サブクエリ）
+        has_group = exists().where(SectionGroup.video_id == Video.video_id)
+        stmt = stmt.where(has_group if has_feedback else ~has_group)
+    videos = (await db.scalars(stmt.order_by(Video.upload_date.desc()).offset(skip).limit(limit))).all()
+    if videos:
+        user = await get_user_cached(db, user_id)
+        for video in videos:
+            set_committed_value(video, "user", user)
+    return videos
+
+
+async def get_all_videos_with_sections(
+    db: AsyncSession, skip: int = 0, limit: int = 100
+) -> List[Video]:
+    res = await db.execute(
+        select(Video)
+        .options(
+            selectinload(Video.section_groups).selectinload(SectionGroup.sections),
+            selectinload(Video.user),
+            raiseload("*", sql_only=True),  # 想定外の N+1 を防ぐ
         )
-        # 新しいピンを設定
-        db.execute(
-            update(Video).where(Video.video_id == video_id).values(is_pinned=True)
-        )
-        db.commit()
+        .order_by(Video.upload_date.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return res.scalars().unique().all()
+
+
+# ---- 更新 ----
+async def update_video(db: AsyncSession, video_id: UUID, video_update: VideoUpdate) -> Optional[Video]:
+    # swing_type / description → swing_form / swing_note の読み替えは VideoUpdate のエイリアスで済んでいる
+    update_data = changed_fields(video_update)
+
+    if not update_data:
+        return await get_video(db, video_id)
+
+    _video_cache.pop(("id", video_id), None)
+    video_views.clear()
+    # RETURNING 対応の方言では UPDATE 1 回で更新後の行を受け取る（MySQL は主キーで 1 回読み直し）
+    video = await update_returning(db, Video, Video.video_id, video_id, update_data)
+    if video is not None and "user" in inspect(video).unloaded:
+        # VideoResponse 用。通常は直前の get_video で identity map に載っているので SQL は出ない
+        await db.refresh(video, attribute_names=["user"])
+    return video
+
+
+# ---- 削除 ----
+async def delete_video(db: AsyncSession, video_id: UUID) -> bool:
+    # ピン留めのエントリは video_id しか持たないので、残っていても get_video が None を返す
+    _video_cache.pop(("id", video_id), None)
+    video_views.clear()
+    res = await db.execute(delete(Video).where(Video.video_id == video_id))
+    return (res.rowcount or 0) > 0
+
+
+# ---- ピン留め ----
+async def set_pinned_video(db: AsyncSession, user_id: UUID, video_id: UUID):
+    # 既存ピンの解除と新しいピンの設定を 1 文で行う（途中でピンが 0 件になる瞬間がない）
+    await db.execute(
+        update(Video)
+        .where(Video.user_id == user_id)
+        .where(or_(Video.is_pinned == True, Video.video_id == video_id))
+        .values(is_pinned=(Video.video_id == video_id))
+    )
+    # 旧ピンの動画 ID は分からないので丸ごと捨てる（ピン留めの変更は稀）
+    _video_cache.clear()
+    video_views.clear()
+
+
+async def get_pinned_video(db: AsyncSession, user_id: UUID) -> Optional[Video]:
+    video_id = _video_cache.get(("pinned", user_id))
+    if video_id is not None:
+        return await get_video(db, video_id)
+    res = await db.execute(
+        select(Video).where(Video.user_id == user_id, Video.is_pinned == True)
+    )
+    video = res.scalars().first()
+    if video is not None:
+        _video_cache[("pinned", user_id)] = video.video_id
+    return video
+
+
+# ---- 添削済み ----
+async def mark_video_as_reviewed(db: AsyncSession, video_id: UUID):
+    await db.execute(
+        update(Video).where(Video.video_id == video_id).values(is_reviewed=True)
+    )
+    _video_cache.pop(("id", video_id), None)
+    video_views.clear()
 
-    @staticmethod
-    def get_pinned_video(db: Session, user_id: UUID) -> Optional[Video]:
-        res = db.execute(
-            select(Video).where(Video.user_id == user_id, Video.is_pinned == True)
-        )
-        return res.scalars().first()
 
-    # ---- 添削済み ----
-    @staticmethod
-    def mark_video_as_reviewed(db: Session, video_id: UUID):
-        db.execute(
-            update(Video).where(Video.video_id == video_id).values(is_reviewed=True)
-        )
-        db.commit()
+class VideoCRUD:
+    """後方互換用の名前空間（既存の video_crud.xxx(...) 呼び出し向け）"""
+    __slots__ = ()
+
+    create_video = staticmethod(create_video)
+    get_video = staticmethod(get_video)
+    get_video_with_sections = staticmethod(get_video_with_sections)
+    get_videos_by_user = staticmethod(get_videos_by_user)
+    get_video_cards = staticmethod(get_video_cards)
+    search_videos = staticmethod(search_videos)
+    get_all_videos_with_sections = staticmethod(get_all_videos_with_sections)
+    update_video = staticmethod(update_video)
+    delete_video = staticmethod(delete_video)
+    set_pinned_video = staticmethod(set_pinned_video)
+    get_pinned_video = staticmethod(get_pinned_video)
+    mark_video_as_reviewed = staticmethod(mark_video_as_reviewed)
 
 
 # インスタンス（既存の import スタイル互換）
@@ -1,32 +1,67 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator  # ← typing からインポートするのが正解
+import os
+import ssl
+from typing import AsyncGenerator
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
 from app.core.config import settings
 
-# --- MySQL 接続 URL の構築 ---
-DATABASE_URL = (
-    f"mysql+pymysql://{settings.database_username}:{settings.database_password}"
-    f"@{settings.database_host}:{settings.database_port}/{settings.database_name}"
-    "?ssl=true"
-    f"&ssl_ca={settings.database_ssl_ca}"
-    "&ssl_verify_cert=true"
-    "&ssl_verify_identity=true"
-)
+# --- MySQL 接続 URL（mysql+aiomysql://…。settings 側で組み立てる） ---
+DATABASE_URL = settings.assemble_db_url()
+
+# 同梱の DigiCert ルート証明書（Azure Database for MySQL 用）
+_BUNDLED_CA = os.path.join(os.path.dirname(__file__), "DigiCertGlobalRootCA.crt.pem")
+
+
+def _ssl_context() -> ssl.SSLContext:
+    """settings.database_ssl_ca → 同梱 pem → システム既定 の順で CA を選ぶ（検証は常に有効）"""
+    for cafile in (settings.database_ssl_ca, _BUNDLED_CA):
+        if cafile and os.path.exists(cafile):
+            return ssl.create_default_context(cafile=cafile)
+    return ssl.create_default_context()
+
+
+# MySQL 用の接続オプション（ローカル/テストの sqlite+aiosqlite は NullPool なのでサイズ指定を渡さない）
+_mysql_kwargs = {}
+if make_url(DATABASE_URL).get_backend_name() == "mysql":
+    _mysql_kwargs = dict(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        # LIFO: 温まった少数の接続（TLS セッション・サーバ側キャッシュ）を優先して使い回す
+        pool_use_lifo=settings.db_pool_use_lifo,
+        # aiomysql / asyncmy は URL クエリの ssl_* を解釈しないので SSLContext で渡す
+        connect_args={"ssl": _ssl_context()},
+    )
 
 # --- エンジン作成 ---
-engine = create_engine(
+engine = create_async_engine(
     DATABASE_URL,
-    pool_pre_ping=True,
-    echo=True if settings.env == "development" else False,  # ← ログ出力はENV依存にしてもよい
+    pool_recycle=settings.db_pool_recycle or 1800,
+    pool_pre_ping=settings.db_pool_pre_ping,  # 既定は無効：SELECT 1 の往復を避け、pool_recycle で切断に備える
+    echo=settings.db_echo,
+    query_cache_size=settings.db_query_cache_size,
+    **_mysql_kwargs,
 )
 
 # --- セッション作成 ---
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# commit 後に属性を失効させない（レスポンス生成時に遅延ロードの SQL を発行させない）
+# autoflush も無効：login や /me のような読み取りだけの execute() ごとに flush の確認を走らせない。
+# 書き込み後に同じセッションで読む CRUD は明示的に flush() する
+SessionLocal = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
 
 # --- 依存関係として使うDBセッション ---
-def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# CRUD 層は flush のみ行い、書き込みを行うハンドラが応答を返す前に自分で commit する。
+# FastAPI 0.104 では yield 以降の処理はレスポンス送信後に走るため、ここでの commit は
+# commit 漏れに備えた保険でしかない（失敗してもクライアントには成功が返った後になる）。
+# 例外時は rollback する。ハンドラ側で commit 済みなら何もしない。close は async with が行う
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with SessionLocal() as db:
+        try:
+            yield db
+            if db.in_transaction():
+                await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
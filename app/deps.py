@@ -2,14 +2,16 @@
 from __future__ import annotations
 
 import os
-from typing import Optional, Generator  # AsyncGeneratorからGeneratorに変更
+from functools import lru_cache
+from typing import Optional
+from uuid import UUID
 
 from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session  # AsyncSessionからSessionに変更
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db  # 正しいモジュールからインポート
+from app.database import get_db
 from app.core.jwt import decode_access_token  # JWTデコード（app/core/jwt.py）
 
 load_dotenv()
@@ -17,16 +19,23 @@ load_dotenv()
 # 本番ルートに合わせる（/api/v1 を使わないなら "/auth/token" に変更）
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
-def get_database() -> Generator[Session, None, None]:
-    """Sync DB session dependency"""
-    # 同期的なget_dbを使用
-    for session in get_db():
-        yield session
+# Async DB session dependency：get_db（async generator）をそのまま使う。
+# ラップすると例外が get_db まで伝播せず rollback されないため、別名で公開する
+get_database = get_db
 
+# 既定 ID はプロセス中に変わらないので、環境変数の参照（と UUID 変換）は初回だけ行う。
+# テスト等で環境変数を差し替えたら各関数の cache_clear() を呼ぶ
+@lru_cache(maxsize=1)
 def get_default_user_id() -> str:
     """Dev用の固定ユーザーID（.env: DEFAULT_USER_ID が優先）"""
     return os.getenv("DEFAULT_USER_ID", "550e8400-e29b-41d4-a716-446655440000")
 
+@lru_cache(maxsize=1)
+def get_default_user_uuid() -> UUID:
+    """get_default_user_id() を UUID にしたもの"""
+    return UUID(get_default_user_id())
+
+@lru_cache(maxsize=1)
 def get_default_coach_id() -> str:
     """Dev用の固定コーチID（.env: DEFAULT_COACH_ID が優先）"""
     return os.getenv("DEFAULT_COACH_ID", "6ba7b810-9dad-11d1-80b4-00c04fd430c8")
@@ -34,7 +43,7 @@ def get_default_coach_id() -> str:
 # ---------- 認証切替ポイント ----------
 def get_current_user_or_dummy(
     token: Optional[str] = Depends(oauth2_scheme),
-    db: Session = Depends(get_database),  # 将来のユーザー検証用に保持
+    db: AsyncSession = Depends(get_database),  # 将来のユーザー検証用に保持
 ) -> str:
     """
     開発中：トークンが無ければデフォルトIDを返す。
@@ -60,7 +69,7 @@ def get_current_user_or_dummy(
 
 def get_current_user_strict(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_database),
+    db: AsyncSession = Depends(get_database),
 ) -> str:
     """
     本番で“ログイン必須”にする場合はこちらをDependsに。
@@ -75,4 +84,5 @@ def get_current_user_strict(
     # if not user or not user.is_active:
     #     raise HTTPException(status_code=401, detail="User not active")
     return sub
+
 # ---------- ここまで ----------
@@ -2,22 +2,23 @@
 from __future__ import annotations
 
 import os
-import io
 import requests
 from datetime import datetime, timedelta
 
 
 from fastapi import FastAPI, HTTPException, File, UploadFile, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy import select
+from sqlalchemy import func, select
 
 from dotenv import load_dotenv
-from azure.storage.blob import BlobServiceClient, generate_blob_sas, BlobSasPermissions
 
 from app.models import create_tables
 from app.core.config import settings
-from app.services.storage import storage_service
+from app.services.blob_proxy import close_http_client, get_http_client, stream_blob
+from app.services.storage import blob_name_from_url, generate_read_sas_url, storage_service
+from app.utils.logger import logger
 
 # Routers
 from app.routers import auth, user, video, coach, upload, transcription, line, location
@@ -29,6 +30,7 @@ app = FastAPI(
     title="Golf Swing Coaching API",
     description="API for managing golf swing video coaching feedback",
     version="1.0.0",
+    default_response_class=ORJSONResponse,  # レスポンスのシリアライズは orjson で行う
 )
 
 # ---- CORS ----
@@ -69,20 +71,23 @@ async def startup_event():
     """アプリケーション起動時の処理"""
     try:
         print("=== アプリケーション起動処理開始 ===")
+
+        # /proxy-file で使う共有 HTTP クライアントを用意
+        get_http_client()
         
         # データベース接続の確認
-        from app.database import get_db
+        from app.database import SessionLocal
         from app.models import User
         
         # データベースセッションを取得
-        db = next(get_db())
+        db = SessionLocal()
         try:
             # profile_picture_urlカラムをTEXT型に変更
             from sqlalchemy import text
             print("profile_picture_urlカラムの修正を開始...")
             
             # カラムの現在の型を確認
-            result = db.execute(text("""
+            result = await db.execute(text("""
                 SELECT COLUMN_TYPE 
                 FROM INFORMATION_SCHEMA.COLUMNS 
                 WHERE TABLE_NAME = 'users' 
@@ -96,8 +101,8 @@ async def startup_event():
                 # カラムがVARCHARの場合のみTEXTに変更
                 if 'varchar' in current_type[0].lower():
                     print("profile_picture_urlカラムをTEXT型に変更中...")
-                    db.execute(text("ALTER TABLE users MODIFY COLUMN profile_picture_url TEXT"))
-                    db.commit()
+                    await db.execute(text("ALTER TABLE users MODIFY COLUMN profile_picture_url TEXT"))
+                    await db.commit()
                     print("profile_picture_urlカラムの修正完了")
                 else:
                     print("profile_picture_urlカラムは既にTEXT型です")
@@ -106,34 +111,42 @@ async def startup_event():
                 
         except Exception as db_error:
             print(f"データベース修正エラー: {str(db_error)}")
-            db.rollback()
+            await db.rollback()
         finally:
-            db.close()
+            await db.close()
             
         print("=== アプリケーション起動処理完了 ===")
         
     except Exception as e:
         print(f"起動処理エラー: {str(e)}")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """アプリケーション終了時の処理"""
+    await close_http_client()
+
 @app.get("/health")
-def health_check():
+async def health_check():
     try:
         print("=== ヘルスチェック開始 ===")
         
         # データベース接続の確認
-        from app.database import get_db
+        from app.database import SessionLocal, engine
         from app.models import User
         
         # データベースセッションを取得
-        db = next(get_db())
+        db = SessionLocal()
         try:
+            # プールの状態は内部情報なので応答には含めず、ログにだけ残す
+            logger.info("コネクションプール: %s", engine.pool.status())
+
             # 簡単なクエリを実行してデータベース接続を確認
             from sqlalchemy import text
-            result = db.execute(text("SELECT 1"))
+            result = await db.execute(text("SELECT 1"))
             print("データベース接続: 成功")
             
             # Userテーブルの件数を確認
-            user_count = db.execute(select(User)).scalar()
+            user_count = (await db.execute(select(func.count()).select_from(User))).scalar()
             print(f"Userテーブル件数: {user_count}")
             
             return {
@@ -151,7 +164,7 @@ def health_check():
                 "timestamp": datetime.utcnow().isoformat()
             }
         finally:
-            db.close()
+            await db.close()
     except Exception as e:
         print(f"ヘルスチェックエラー: {str(e)}")
         return {
@@ -161,23 +174,23 @@ def health_check():
         }
 
 @app.post("/api/v1/fix-database")
-def fix_database():
+async def fix_database():
     """データベース修正用エンドポイント"""
     try:
         print("=== データベース修正開始 ===")
         
         # データベース接続の確認
-        from app.database import get_db
+        from app.database import SessionLocal
         
         # データベースセッションを取得
-        db = next(get_db())
+        db = SessionLocal()
         try:
             # profile_picture_urlカラムをTEXT型に変更
             from sqlalchemy import text
             print("profile_picture_urlカラムの修正を開始...")
             
             # カラムの現在の型を確認
-            result = db.execute(text("""
+            result = await db.execute(text("""
                 SELECT COLUMN_TYPE 
                 FROM INFORMATION_SCHEMA.COLUMNS 
                 WHERE TABLE_NAME = 'users' 
@@ -191,8 +204,8 @@ def fix_database():
                 # カラムがVARCHARの場合のみTEXTに変更
                 if 'varchar' in current_type[0].lower():
                     print("profile_picture_urlカラムをTEXT型に変更中...")
-                    db.execute(text("ALTER TABLE users MODIFY COLUMN profile_picture_url TEXT"))
-                    db.commit()
+                    await db.execute(text("ALTER TABLE users MODIFY COLUMN profile_picture_url TEXT"))
+                    await db.commit()
                     print("profile_picture_urlカラムの修正完了")
                     return {
                         "status": "success",
@@ -216,13 +229,13 @@ def fix_database():
                 
         except Exception as db_error:
             print(f"データベース修正エラー: {str(db_error)}")
-            db.rollback()
+            await db.rollback()
             return {
                 "status": "error",
                 "message": f"データベース修正エラー: {str(db_error)}"
             }
         finally:
-            db.close()
+            await db.close()
             
     except Exception as e:
         print(f"データベース修正エラー: {str(e)}")
@@ -240,12 +253,7 @@ def get_media_url(blob_url: str):
     """
     try:
         # blob_url から blob のパス（container 配下）を抽出
-        if blob_url.startswith("https://"):
-            # https://{account}.blob.core.windows.net/{container}/{path...}
-            parts = blob_url.split("/")
-            filename = "/".join(parts[4:])  # container 以降
-        else:
-            filename = blob_url
+        filename = blob_name_from_url(blob_url)
 
         # Azure 設定
         connection_string = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
@@ -253,21 +261,8 @@ def get_media_url(blob_url: str):
         if not connection_string:
             raise HTTPException(status_code=500, detail="Azure接続設定が見つかりません")
 
-        # Blob Service Client
-        blob_service_client = BlobServiceClient.from_connection_string(connection_string)
-        account_key = blob_service_client.credential.account_key
-        account_name = blob_service_client.account_name
-
-        # SAS トークン（15分）
-        sas_token = generate_blob_sas(
-            account_name=account_name,
-            container_name=container_name,
-            blob_name=filename,
-            account_key=account_key,
-            permission=BlobSasPermissions(read=True),
-            expiry=datetime.utcnow() + timedelta(minutes=15),
-        )
-        sas_url = f"https://{account_name}.blob.core.windows.net/{container_name}/{filename}?{sas_token}"
+        # SAS URL（15分。発行済みで残り時間が十分ならキャッシュから返す）
+        sas_url = generate_read_sas_url(connection_string, container_name, filename, timedelta(minutes=15))
         return {"url": sas_url}
 
     except Exception as e:
@@ -276,12 +271,11 @@ def get_media_url(blob_url: str):
 
 # ---- Azure Blob のプロキシ（SAS を内部発行して取得）----
 @app.get("/proxy-file/{file_path:path}")
-def proxy_file(file_path: str):
+async def proxy_file(file_path: str):
     """
     Azure Blob Storage ファイルのプロキシエンドポイント
     """
     try:
-        from fastapi.responses import Response
         import urllib.parse
 
         decoded_file_path = urllib.parse.unquote(file_path)
@@ -290,15 +284,9 @@ def proxy_file(file_path: str):
         media_response = get_media_url(decoded_file_path)
         sas_url = media_response["url"]
 
-        # 取得してプロキシ
-        response = requests.get(sas_url)
-        if response.status_code != 200:
-            raise HTTPException(status_code=response.status_code, detail="ファイルの取得に失敗しました")
-        content = response.content
-        content_type = response.headers.get("content-type", "application/octet-stream")
-        return Response(
-            content=content,
-            media_type=content_type,
+        # 取得しながらそのまま流す（全体をメモリに読み込まない）
+        return await stream_blob(
+            sas_url,
             headers={
                 "Cache-Control": "no-cache, no-store, must-revalidate",
                 "Pragma": "no-cache",
@@ -321,10 +309,8 @@ def upload_section_image(image_file: UploadFile = File(...)):
         if not image_file.content_type or not image_file.content_type.startswith("image/"):
             raise HTTPException(status_code=400, detail="画像ファイルのみアップロード可能です")
 
-        file_content = image_file.read()
-        file_stream = io.BytesIO(file_content)
-
-        image_url = storage_service.upload_image(file_stream, image_file.filename or "section_image.jpg")
+        # スプール済みのファイルをそのまま渡す（全体を読み込んでコピーしない）
+        image_url = storage_service.upload_image(image_file.file, image_file.filename or "section_image.jpg")
         return {"success": True, "image_url": image_url, "message": "画像のアップロードが完了しました"}
 
     except Exception as e:
@@ -355,8 +341,7 @@ def upload_markup_image(
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Base64デコードに失敗しました: {str(e)}")
 
-        file_stream = io.BytesIO(file_content)
-        image_url = storage_service.upload_image(file_stream, filename)
+        image_url = storage_service.upload_image(file_content, filename)
 
         return {"success": True, "image_url": image_url, "message": "マークアップ画像のアップロードが完了しました", "original_url": original_url}
 
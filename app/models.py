@@ -1,12 +1,10 @@
 from __future__ import annotations
 
 import enum
-import os
 import uuid
 from datetime import datetime, date
 import uuid
 from uuid import UUID
-import ssl
 
 from sqlalchemy import (
     Column,
@@ -22,32 +20,44 @@ from sqlalchemy import (
     TypeDecorator,
     CHAR,
     Boolean,
-    create_engine,
+    Index,
 )
-from sqlalchemy.dialects.mysql import CHAR as MYSQL_CHAR
-from sqlalchemy.orm import relationship, sessionmaker, declarative_base, Session
+from sqlalchemy.dialects.mysql import BINARY as MYSQL_BINARY
+from sqlalchemy.orm import relationship, declarative_base
 from sqlalchemy.sql import func
 
-from app.core.config import settings
+from app.utils.timezone import now_utc
 
+# Python 側で入れる日時は now_utc（tz 付き UTC）に揃え、同じ行で DB の NOW() と混在させない
 Base = declarative_base()
 
-# -------- GUID (UUID文字列を36桁で保存) --------
+# -------- GUID (MySQL は BINARY(16)、それ以外は UUID 文字列 36 桁で保存) --------
 class GUID(TypeDecorator):
     impl = CHAR
     cache_ok = True
 
     def load_dialect_impl(self, dialect):
-        return dialect.type_descriptor(MYSQL_CHAR(36)) if dialect.name == "mysql" else dialect.type_descriptor(CHAR(36))
+        return dialect.type_descriptor(MYSQL_BINARY(16)) if dialect.name == "mysql" else dialect.type_descriptor(CHAR(36))
+
+    @staticmethod
+    def _to_uuid(value) -> uuid.UUID:
+        if isinstance(value, uuid.UUID):
+            return value
+        if isinstance(value, (bytes, bytearray)) and len(value) == 16:
+            return uuid.UUID(bytes=bytes(value))
+        return uuid.UUID(str(value))
 
     def process_bind_param(self, value, dialect):
-        return None if value is None else str(value)
+        if value is None:
+            return None
+        value = self._to_uuid(value)
+        return value.bytes if dialect.name == "mysql" else str(value)
 
     def process_result_value(self, value, dialect):
         if value is None:
             return None
         try:
-            return uuid.UUID(str(value))
+            return self._to_uuid(value)
         except (ValueError, TypeError):
             # UUID形式が不正な場合はNoneを返す
             print(f"Warning: Invalid UUID format: {value}")
@@ -82,8 +92,9 @@ class User(Base):
     profile_picture_url = Column(Text, nullable=True)
     bio = Column(Text, nullable=True)
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # 登録・プロフィール更新後に読み直しの SELECT を出さないよう、日時は Python 側で入れる（UTC）
+    created_at = Column(DateTime(timezone=True), default=now_utc)
+    updated_at = Column(DateTime(timezone=True), default=now_utc, onupdate=now_utc)
 
     birthday = Column(Date, nullable=True)
     golf_score_ave = Column(Integer, nullable=True)
@@ -102,6 +113,12 @@ class User(Base):
     # リレーション
     videos = relationship("Video", back_populates="user")
 
+    __table_args__ = (
+        Index("ix_users_created_at", "created_at"),  # list() の ORDER BY 用
+        # ログイン（email → password_hash, user_id）を索引だけで返す。InnoDB の二次索引は主キーを含むので user_id は書かない
+        Index("ix_users_email_login", "email", "password_hash"),
+    )
+
 # -------- Coaches --------
 class Coach(Base):
     __tablename__ = "coaches"
@@ -116,8 +133,9 @@ class Coach(Base):
     profile_picture_url = Column(Text, nullable=True)
     bio = Column(Text, nullable=True)
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # 登録・プロフィール更新後に読み直しの SELECT を出さないよう、日時は Python 側で入れる（UTC）
+    created_at = Column(DateTime(timezone=True), default=now_utc)
+    updated_at = Column(DateTime(timezone=True), default=now_utc, onupdate=now_utc)
 
     birthday = Column(Date, nullable=True)
     sex = Column(String(50), nullable=True)
@@ -139,11 +157,18 @@ class Coach(Base):
     setting_3 = Column(String(50), nullable=True)
     lesson_rank = Column(String(50), nullable=True)
 
+    __table_args__ = (
+        Index("ix_coaches_created_at", "created_at"),  # list() の ORDER BY 用
+        # ログイン（email → password_hash, coach_id）を索引だけで返す
+        Index("ix_coaches_email_login", "email", "password_hash"),
+    )
+
 # -------- Location --------
 class Location(Base):
     __tablename__ = "locations"
 
-    location_id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()), index=True)
+    # 主キーなので別途 index は張らない（重複インデックスは INSERT/UPDATE のコストを増やすだけ）
+    location_id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     location_name = Column(String(255), nullable=False)
     state = Column(String(50), nullable=False)
     address1 = Column(String(255), nullable=False)
@@ -159,8 +184,9 @@ class Location(Base):
     image_url_sub2 = Column(Text)
     image_url_sub3 = Column(Text)
     image_url_sub4 = Column(Text)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # 作成・更新後に読み直しの SELECT を出さないよう、日時は Python 側で入れる（UTC）
+    created_at = Column(DateTime(timezone=True), default=now_utc)
+    updated_at = Column(DateTime(timezone=True), default=now_utc, onupdate=now_utc)
 
 
 # -------- Videos --------
@@ -179,14 +205,30 @@ class Video(Base):
     is_reviewed = Column(Boolean, default=False)
 
     section_group_id = Column(GUID(), nullable=True)
-    upload_date = Column(DateTime(timezone=True), server_default=func.now())
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
-
-    section_groups = relationship("SectionGroup", back_populates="video")
-    sessions = relationship("CoachingSession", back_populates="video")
+    # 日時は Python 側でも値を入れる（INSERT/UPDATE 後に読み直しの SELECT を出さないため。既定値は UTC）
+    upload_date = Column(DateTime(timezone=True), default=now_utc)
+    created_at = Column(DateTime(timezone=True), default=now_utc)
+    updated_at = Column(DateTime(timezone=True), default=now_utc, onupdate=now_utc)
+
+    # コレクションは暗黙の遅延ロード（N+1）を禁止し、CRUD 側で selectinload を明示する
+    section_groups = relationship("SectionGroup", back_populates="video", lazy="raise_on_sql")
+    sessions = relationship("CoachingSession", back_populates="video", lazy="raise_on_sql")
     user = relationship("User", back_populates="videos")
 
+    @property
+    def sections(self):
+        """最初の SectionGroup のセクション（VideoWithSectionsResponse 用。section_groups の先読みが前提）"""
+        return self.section_groups[0].sections if self.section_groups else []
+
+    __table_args__ = (
+        # get_videos_by_user（user_id 絞り込み + upload_date 降順）を filesort なしで返す
+        Index("ix_videos_user_upload", "user_id", "upload_date"),
+        # get_pinned_video（user_id + is_pinned）
+        Index("ix_videos_user_pinned", "user_id", "is_pinned"),
+        # search_videos（user_id + club_type + swing_form の絞り込み）
+        Index("ix_videos_user_club_form", "user_id", "club_type", "swing_form"),
+    )
+
 
 
 # -------- Coaching Session (動画添削依頼) --------
@@ -227,6 +269,12 @@ class CoachingReservation(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    # ユーザー別・コーチ別の予約一覧（session_date 降順）を filesort なしで返す
+    __table_args__ = (
+        Index("ix_res_user_date", "user_id", "session_date"),
+        Index("ix_res_coach_date", "coach_id", "session_date"),
+    )
+
 # -------- Section Groups --------
 class SectionGroup(Base):
     __tablename__ = "section_groups"
@@ -234,7 +282,7 @@ class SectionGroup(Base):
     section_group_id = Column(GUID(), primary_key=True, default=uuid.uuid4)
     video_id = Column(GUID(), ForeignKey("videos.video_id"), nullable=False)
     session_id = Column(String(255), nullable=True)  # 外部キー制約を削除し、文字列型に変更
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=now_utc)
 
     # 相手機能取り込み用（任意）
     overall_feedback = Column(Text, nullable=True)
@@ -245,7 +293,7 @@ class SectionGroup(Base):
 
     video = relationship("Video", back_populates="section_groups")
     # session = relationship("CoachingSession", back_populates="section_groups")  # リレーションシップを削除
-    sections = relationship("SwingSection", back_populates="section_group")
+    sections = relationship("SwingSection", back_populates="section_group", lazy="raise_on_sql")
 
 # -------- Swing Sections --------
 class SwingSection(Base):
@@ -264,38 +312,15 @@ class SwingSection(Base):
 
     section_group = relationship("SectionGroup", back_populates="sections")
 
-# ---------- Sync Engine / Session ----------
-DATABASE_URL = settings.assemble_db_url()
-
-pem = os.path.join(os.path.dirname(__file__), "DigiCertGlobalRootCA.crt.pem")
-if os.path.exists(pem):
-    ssl_ctx = ssl.create_default_context(cafile=pem)
-else:
-    ssl_ctx = ssl.create_default_context()
-    ssl_ctx.check_hostname = False
-    ssl_ctx.verify_mode = ssl.CERT_NONE  # 証明書なしでTLS必須環境を満たす
-
-engine = create_engine(
-    DATABASE_URL,
-    echo=(settings.env.lower() == "development"),
-    pool_size=5,
-    max_overflow=10,
-    pool_recycle=1800,
-    pool_pre_ping=True,
-    connect_args={"ssl": ssl_ctx},
-)
+    __table_args__ = (
+        Index("ix_sections_group_start", "section_group_id", "start_sec"),
+    )
 
-SessionLocal = sessionmaker(
-    engine, class_=Session, expire_on_commit=False
-)
+# ---------- Engine ----------
+# エンジン / セッションは app.database の 1 系統のみ（テーブル作成にだけ使う。他モジュールは app.database から import する）
+from app.database import engine  # noqa: E402
 
-def create_tables():
-    with engine.begin() as conn:
-        conn.execute(Base.metadata.create_all)
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+async def create_tables():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
@@ -2,9 +2,11 @@
 from __future__ import annotations
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy import select
-from sqlalchemy.orm import Session  # AsyncSessionからSessionに変更
+from sqlalchemy import bindparam, desc, inspect as sa_inspect, literal, select, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # モデルのインポート
 from app.models import User, Coach
@@ -21,64 +23,102 @@ from app.schemas.user import (
     UserMini,
 )
 from app.schemas.coach import CoachCreate, CoachResponse, CoachOut,CoachUpdate
-from sqlalchemy import select
-from app.crud import user_crud
+from app.crud import user_crud, video_views
+from app.utils.logger import logger
 
 router = APIRouter(tags=["auth"])
 
+# /me 用：UserMini / CoachOut に必要な列だけを users → coaches の順で 1 往復で取る（TEXT 列は読まない）
+_ME_CANDIDATES = union_all(
+    select(
+        literal("user").label("kind"), User.user_id.label("id"), User.username.label("name"),
+        User.email, User.created_at,
+    ).where(User.user_id == bindparam("account_id")),
+    select(
+        literal("coach").label("kind"), Coach.coach_id.label("id"), Coach.coachname.label("name"),
+        Coach.email, Coach.created_at,
+    ).where(Coach.coach_id == bindparam("account_id")),
+).order_by(desc("kind"))
+
+# プロフィール PATCH で書き換えてよい列（主キー・パスワード・タイムスタンプは除外）
+_USER_PROFILE_COLS = frozenset(a.key for a in sa_inspect(User).column_attrs) - {"user_id", "password_hash", "created_at", "updated_at"}
+_COACH_PROFILE_COLS = frozenset(a.key for a in sa_inspect(Coach).column_attrs) - {"coach_id", "password_hash", "created_at", "updated_at"}
+
+# 該当アカウントが無いときも同じコストで 1 回検証し、応答時間から登録有無を推測させない
+_DUMMY_HASH = get_password_hash("x" * 16)
+
+# 認証まわりの定型 SELECT はモジュールで 1 度だけ組み立て、値はバインド変数で渡す
+# （文オブジェクトを使い回すので、キャッシュキー生成・コンパイル済み SQL の再利用が毎回効く）
+# users / coaches をまたいだ email の重複確認（1 往復）
+_EMAIL_TAKEN = union_all(
+    select(literal(1)).where(User.email == bindparam("email")),
+    select(literal(1)).where(Coach.email == bindparam("email")),
+).limit(1)
+
+# ログイン候補を users → coaches の順で 1 往復で取る（kind でどちらの行かを見分ける。'user' > 'coach' なので降順）
+_LOGIN_CANDIDATES = union_all(
+    select(literal("user").label("kind"), User.user_id.label("id"), User.password_hash)
+    .where(User.email == bindparam("email")),
+    select(literal("coach").label("kind"), Coach.coach_id.label("id"), Coach.password_hash)
+    .where(Coach.email == bindparam("email")),
+).order_by(desc("kind"))
+
 
 # ---------------------------
 # Register (User)
 # ---------------------------
 @router.post("/register/user", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_user(payload: UserRegister, db: Session = Depends(get_database)):
-    u = db.execute(select(User).where(User.email == payload.email)).scalar_one_or_none()
-    if u:
-        raise HTTPException(400, "既に登録されたメールアドレスです")
-
+async def register_user(payload: UserRegister, db: AsyncSession = Depends(get_database)):
     db_user = User(
         username=payload.username,
         email=payload.email,
         gender=payload.gender,
         birthday=payload.birthday,
-        password_hash=get_password_hash(payload.password),
+        password_hash=await run_in_threadpool(get_password_hash, payload.password),
         usertype="user",
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    # email の重複は事前 SELECT ではなく一意制約（users.email）で検出する（1 往復・競合なし）
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(400, "既に登録されたメールアドレスです")
 
-    return UserResponse.model_validate(db_user, from_attributes=True)
+    # ORM オブジェクトのまま返す（response_model による from_attributes 検証が 1 回だけ走る）
+    return db_user
 
 @router.patch("/user/{user_id}/profile", response_model=UserResponse)
-def update_user_profile(user_id: UUID, payload: UserProfileUpdate, db: Session = Depends(get_database)):
-    user = db.execute(select(User).where(User.user_id == user_id)).scalar_one_or_none()
+async def update_user_profile(user_id: UUID, payload: UserProfileUpdate, db: AsyncSession = Depends(get_database)):
+    user = await db.get(User, user_id)  # 主キー検索は identity map を先に見る
     if not user:
         raise HTTPException(404, "ユーザーが見つかりません")
 
-    for key, value in payload.dict(exclude_unset=True).items():
-        setattr(user, key, value)
+    data = payload.model_dump(exclude_unset=True)
+    for key in data.keys() & _USER_PROFILE_COLS:
+        setattr(user, key, data[key])
+    user_crud.invalidate_cache(user_id)
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    video_views.clear()  # 動画レスポンスに投稿者情報を載せているため
 
-    return UserResponse.model_validate(user, from_attributes=True)
+    return user
 
 # ---------------------------
 # Register (Coach)
 # ---------------------------
 @router.post("/register/coach", response_model=CoachResponse, status_code=status.HTTP_201_CREATED)
-def register_coach(payload: CoachCreate, db: Session = Depends(get_database)):
-    u = db.execute(select(User).where(User.email == payload.email)).scalar_one_or_none()
-    c = db.execute(select(Coach).where(Coach.email == payload.email)).scalar_one_or_none()
-    if u or c:
+async def register_coach(payload: CoachCreate, db: AsyncSession = Depends(get_database)):
+    # users 側との重複は一意制約では防げないので確認する。coaches 同士の競合は INSERT 時の一意制約で検出
+    taken = (await db.execute(_EMAIL_TAKEN, {"email": payload.email})).first()
+    if taken:
         raise HTTPException(status_code=400, detail="すでに登録済みのメールアドレスです")
 
     db_coach = Coach(
         coachname=payload.coachname,
         email=payload.email,
         usertype=payload.usertype or "coach",
-        password_hash=get_password_hash(payload.password),
+        password_hash=await run_in_threadpool(get_password_hash, payload.password),  # 重複なら bcrypt しない
         birthday=payload.birthday,
         sex=payload.sex,
         SNS_handle_instagram=payload.SNS_handle_instagram,
@@ -99,108 +139,70 @@ def register_coach(payload: CoachCreate, db: Session = Depends(get_database)):
         lesson_rank=payload.lesson_rank,
     )
     db.add(db_coach)
-    db.commit()
-    db.refresh(db_coach)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="すでに登録済みのメールアドレスです")
     return db_coach
 
 @router.patch("/coach/{coach_id}/profile", response_model=CoachResponse)
-def update_coach_profile(coach_id: UUID, payload: CoachUpdate, db: Session = Depends(get_database)):
-    coach = db.execute(select(Coach).where(Coach.coach_id == coach_id)).scalar_one_or_none()
+async def update_coach_profile(coach_id: UUID, payload: CoachUpdate, db: AsyncSession = Depends(get_database)):
+    coach = await db.get(Coach, coach_id)  # 主キー検索は identity map を先に見る
     if not coach:
         raise HTTPException(404, "コーチが見つかりません")
 
-    for key, value in payload.dict(exclude_unset=True).items():
-        setattr(coach, key, value)
+    data = payload.model_dump(exclude_unset=True)
+    for key in data.keys() & _COACH_PROFILE_COLS:
+        setattr(coach, key, data[key])
 
-    db.commit()
-    db.refresh(coach)
+    await db.commit()
 
-    return CoachResponse.model_validate(coach, from_attributes=True)
+    return coach
 
 
 # ---------------------------
 # Login (User or Coach 共通)
 # ---------------------------
 @router.post("/token")
-def login_any(
+async def login_any(
     form: OAuth2PasswordRequestForm = Depends(),  # username に email を入れて送る
-    db: Session = Depends(get_database),
+    db: AsyncSession = Depends(get_database),
 ):
-    try:
-        print(f"=== ログイン試行開始 ===")
-        print(f"受信したemail: {form.username}")
-        print(f"パスワード長: {len(form.password) if form.password else 0}")
-        
-        email = form.username
-        
-        if not email:
-            print("エラー: emailが空です")
-            raise HTTPException(status_code=400, detail="メールアドレスが入力されていません")
-        
-        if not form.password:
-            print("エラー: パスワードが空です")
-            raise HTTPException(status_code=400, detail="パスワードが入力されていません")
-
-        # Userとして認証
-        print(f"Userテーブルで検索中: {email}")
-        u = db.execute(select(User).where(User.email == email)).scalar_one_or_none()
-        
-        if u:
-            print(f"Userが見つかりました: {u.user_id}")
-            print(f"パスワード検証中...")
-            if verify_password(form.password, u.password_hash):
-                print(f"パスワード検証成功")
-                expires = timedelta(minutes=settings.access_token_expire_minutes)
-                token = create_access_token({"sub": str(u.user_id), "role": "user"}, expires)
-                print(f"トークン生成成功: {token[:20]}...")
-                return {"access_token": token, "token_type": "bearer", "role": "user"}
-            else:
-                print(f"パスワード検証失敗")
-        else:
-            print(f"Userが見つかりませんでした: {email}")
-
-        # Coachとして認証
-        print(f"Coachテーブルで検索中: {email}")
-        c = db.execute(select(Coach).where(Coach.email == email)).scalar_one_or_none()
-        
-        if c:
-            print(f"Coachが見つかりました: {c.coach_id}")
-            print(f"パスワード検証中...")
-            if verify_password(form.password, c.password_hash):
-                print(f"パスワード検証成功")
-                expires = timedelta(minutes=settings.access_token_expire_minutes)
-                token = create_access_token({"sub": str(c.coach_id), "role": "coach"}, expires)
-                print(f"トークン生成成功: {token[:20]}...")
-                return {"access_token": token, "token_type": "bearer", "role": "coach"}
-            else:
-                print(f"パスワード検証失敗")
-        else:
-            print(f"Coachが見つかりませんでした: {email}")
-
-        print(f"認証失敗: メールアドレスまたはパスワードが正しくありません")
-        raise HTTPException(status_code=401, detail="メールアドレスまたはパスワードが正しくありません")
-        
-    except HTTPException:
-        # HTTPExceptionは再送出
-        raise
-    except Exception as e:
-        print(f"ログイン処理で予期しないエラーが発生: {str(e)}")
-        print(f"エラータイプ: {type(e).__name__}")
-        import traceback
-        print(f"スタックトレース: {traceback.format_exc()}")
-        raise HTTPException(status_code=500, detail=f"ログイン処理でエラーが発生しました: {str(e)}")
+    email = form.username
+    if not email:
+        raise HTTPException(status_code=400, detail="メールアドレスが入力されていません")
+    if not form.password:
+        raise HTTPException(status_code=400, detail="パスワードが入力されていません")
+
+    # User → Coach の順に認証（両テーブルの候補は 1 回の UNION ALL で取得）
+    candidates = (await db.execute(_LOGIN_CANDIDATES, {"email": email})).all()
+    if not candidates:
+        await run_in_threadpool(verify_password, form.password, _DUMMY_HASH)
+    for kind, account_id, password_hash in candidates:
+        if await run_in_threadpool(verify_password, form.password, password_hash):
+            expires = timedelta(minutes=settings.access_token_expire_minutes)
+            token = create_access_token({"sub": str(account_id), "role": kind}, expires)
+            logger.debug("login succeeded: role=%s id=%s", kind, account_id)
+            return {"access_token": token, "token_type": "bearer", "role": kind}
+
+    logger.debug("login failed: email=%s candidates=%d", email, len(candidates))
+    raise HTTPException(status_code=401, detail="メールアドレスまたはパスワードが正しくありません")
 
 
 # ---------------------------
 # Me
 # ---------------------------
 @router.get("/me")
-def me(sub: str = Depends(get_current_user_strict), db: Session = Depends(get_database)):
+async def me(sub: str = Depends(get_current_user_strict), db: AsyncSession = Depends(get_database)):
     # sub は JWT の "sub"（= user_id or coach_id）
-    u = db.execute(select(User).where(User.user_id == sub)).scalar_one_or_none()
-    if u:
-        return {"role": "user", "profile": UserMini.model_validate(u)}
-    c = db.execute(select(Coach).where(Coach.coach_id == sub)).scalar_one_or_none()
-    if c:
-        return {"role": "coach", "profile": CoachOut.model_validate(c)}
-    raise HTTPException(status_code=404, detail="ユーザーが見つかりません")
+    try:
+        account_id = UUID(str(sub))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
+    row = (await db.execute(_ME_CANDIDATES, {"account_id": account_id})).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="ユーザーが見つかりません")
+    if row.kind == "user":
+        return {"role": "user", "profile": UserMini(user_id=row.id, username=row.name, email=row.email)}
+    return {"role": "coach", "profile": CoachOut(coach_id=row.id, coachname=row.name, email=row.email, created_at=row.created_at)}
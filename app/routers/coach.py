@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Form
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
 from uuid import UUID
 from decimal import Decimal
@@ -32,11 +33,12 @@ class VideoStatusUpdateRequest(BaseModel):
 router = APIRouter()
 
 # アドバイスデータ保存・取得用のエンドポイント
+# 以下 4 つはファイルのみを読み書きするので DB セッションは受け取らない。
+# ブロッキングなファイル I/O なので def のままにしてスレッドプールで実行させる
 @router.post("/save-advices/{video_id}")
 def save_advices(
     video_id: str,
     advices: List[Dict[str, Any]],
-    db: Session = Depends(get_database)
 ):
     """
     アドバイスデータを保存する
@@ -68,7 +70,6 @@ def save_advices(
 @router.get("/get-advices/{video_id}")
 def get_advices(
     video_id: str,
-    db: Session = Depends(get_database)
 ):
     """
     アドバイスデータを取得する
@@ -99,7 +100,6 @@ def save_markup_image(
     image_data: str = Form(...),
     filename: str = Form(...),
     original_url: str = Form(...),
-    db: Session = Depends(get_database)
 ):
     """
     マークアップ画像データを保存する
@@ -136,7 +136,6 @@ def save_markup_image(
 @router.get("/get-markup-image/{filename}")
 def get_markup_image(
     filename: str,
-    db: Session = Depends(get_database)
 ):
     """
     マークアップ画像データを取得する
@@ -165,10 +164,10 @@ def get_markup_image(
         raise HTTPException(status_code=500, detail=f"マークアップ画像の取得に失敗しました: {str(e)}")
 
 @router.post("/create-section-group/{video_id}", response_model=SectionGroupResponse)
-def create_section_group(
+async def create_section_group(
     video_id: UUID,
     section_group_data: SectionGroupCreate,
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_database)
 ):
     """
     Create a section group for a video to start adding swing sections
@@ -177,7 +176,7 @@ def create_section_group(
     """
     try:
         # Verify video exists and get with sections
-        video = video_crud.get_video_with_sections(db, video_id)
+        video = await video_crud.get_video_with_sections(db, video_id)
         if not video:
             raise HTTPException(status_code=404, detail="動画が見つかりません")
         
@@ -193,7 +192,8 @@ def create_section_group(
         # Create new section group
         # video_idをリクエストボディのデータに設定
         section_group_data.video_id = video_id
-        section_group = section_group_crud.create_section_group(db, section_group_data)
+        section_group = await section_group_crud.create_section_group(db, section_group_data)
+        await db.commit()
         
         return section_group
         
@@ -206,10 +206,10 @@ def create_section_group(
 
 # フロントエンド用のセクショングループ作成API（既存のAPIを修正）
 @router.post("/create-section-group-frontend/{video_id}")
-def create_section_group_frontend(
+async def create_section_group_frontend(
     video_id: UUID,
     request_data: dict,
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_database)
 ):
     """
     Create a section group for a video (frontend optimized version)
@@ -219,12 +219,12 @@ def create_section_group_frontend(
     """
     try:
         # Verify video exists
-        video = video_crud.get_video(db, video_id)
+        video = await video_crud.get_video(db, video_id)
         if not video:
             raise HTTPException(status_code=404, detail="動画が見つかりません")
         
         # Check if section group already exists
-        existing_groups = section_group_crud.get_section_groups_by_video(db, video_id)
+        existing_groups = await section_group_crud.get_section_groups_by_video(db, video_id)
         if existing_groups:
             existing_group = existing_groups[0]
             return {
@@ -241,10 +241,11 @@ def create_section_group_frontend(
             session_id=session_id
         )
         
-        section_group = section_group_crud.create_section_group(db, section_group_data)
+        section_group = await section_group_crud.create_section_group(db, section_group_data)
         
         if not section_group:
             raise HTTPException(status_code=500, detail="セクショングループの作成に失敗しました")
+        await db.commit()
         
         return {
             "message": "セクショングループが正常に作成されました",
@@ -258,7 +259,7 @@ def create_section_group_frontend(
         raise HTTPException(status_code=500, detail=f"セクショングループの作成に失敗しました: {str(e)}")
 
 @router.post("/add-section/{section_group_id}", response_model=SwingSectionResponse)
-def add_swing_section(
+async def add_swing_section(
     section_group_id: UUID,
     start_sec: float = Form(...),
     end_sec: float = Form(...),
@@ -266,7 +267,7 @@ def add_swing_section(
     image_url: Optional[str] = Form(None),
     tags: Optional[str] = Form(None),
     coach_comment: Optional[str] = Form(None),
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_database)
 ):
     """
     Add a swing section to a section group
@@ -281,7 +282,7 @@ def add_swing_section(
     """
     try:
         # Verify section group exists
-        section_group = section_group_crud.get_section_group(db, section_group_id)
+        section_group = await section_group_crud.get_section_group(db, section_group_id)
         if not section_group:
             raise HTTPException(status_code=404, detail="セクショングループが見つかりません")
         
@@ -295,8 +296,10 @@ def add_swing_section(
             if not markup_image.content_type or not markup_image.content_type.startswith('image/'):
                 raise HTTPException(status_code=400, detail="マークアップファイルは画像ファイルである必要があります")
             
-            # Upload markup image
-            final_image_url = storage_service.upload_image(
+            # Upload markup image（アップロードの間は DB 接続を握らないよう、読み取りのトランザクションを閉じておく）
+            await db.commit()
+            final_image_url = await run_in_threadpool(
+                storage_service.upload_image,
                 markup_image.file,
                 markup_image.filename
             )
@@ -318,24 +321,27 @@ def add_swing_section(
             tags=parsed_tags
         )
         
-        section = swing_section_crud.create_section(db, section_data)
+        section = await swing_section_crud.create_section(db, section_data)
+        # AI 要約（外部 API）を待つ間に行ロック・接続を握らないよう、先に確定させる
+        await db.commit()
         
         # Add coach comment if provided
         if coach_comment and section:
             # Generate summary using AI
             try:
-                summary = ai_service.summarize_coach_comment(coach_comment)
+                summary = await run_in_threadpool(ai_service.summarize_coach_comment, coach_comment)
             except Exception as e:
                 # Fallback to simple truncation if AI fails
                 print(f"AI summarization failed: {e}")
                 summary = coach_comment[:200] + "..." if len(coach_comment) > 200 else coach_comment
             
             # Update section with comment and summary
-            updated_section = swing_section_crud.add_coach_comment(
+            updated_section = await swing_section_crud.add_coach_comment(
                 db, section.section_id, coach_comment, summary
             )
             if updated_section:
                 section = updated_section
+            await db.commit()
         
         return section
         
@@ -351,11 +357,11 @@ def add_swing_section(
         raise HTTPException(status_code=500, detail=f"セクションの追加に失敗しました: {str(e)}")
 
 @router.post("/add-coach-comment/{section_id}", response_model=CoachCommentResponse)
-def add_coach_comment(
+async def add_coach_comment(
     section_id: UUID,
     audio_file: UploadFile = File(...),
     coach_id: Optional[str] = Form(None),
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_database)
 ):
     """
     Add coach comment via audio transcription
@@ -366,35 +372,39 @@ def add_coach_comment(
     """
     try:
         # Verify section exists
-        section = swing_section_crud.get_section(db, section_id)
+        section = await swing_section_crud.get_section(db, section_id)
         if not section:
             raise HTTPException(status_code=404, detail="セクションが見つかりません")
         
         # Validate audio file format
-        if not transcription_service.validate_audio_format(audio_file.file):
+        if not await run_in_threadpool(transcription_service.validate_audio_format, audio_file.file):
             raise HTTPException(status_code=400, detail="サポートされていない音声ファイル形式です")
         
+        # 文字起こし・AI 要約（外部 API）の間は DB 接続を握らないよう、読み取りのトランザクションを閉じておく
+        await db.commit()
+        
         # Transcribe audio to text
         try:
-            transcribed_text = transcription_service.transcribe_audio(audio_file.file)
+            transcribed_text = await run_in_threadpool(transcription_service.transcribe_audio, audio_file.file)
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"音声の文字起こしに失敗しました: {str(e)}")
         
         # Generate summary using AI
         try:
-            summary = ai_service.summarize_coach_comment(transcribed_text)
+            summary = await run_in_threadpool(ai_service.summarize_coach_comment, transcribed_text)
         except Exception as e:
             # Fallback to simple truncation if AI fails
             print(f"AI summarization failed: {e}")
             summary = transcribed_text[:200] + "..." if len(transcribed_text) > 200 else transcribed_text
         
         # Update section with comment and summary
-        updated_section = swing_section_crud.add_coach_comment(
+        updated_section = await swing_section_crud.add_coach_comment(
             db, section_id, transcribed_text, summary
         )
         
         if not updated_section:
             raise HTTPException(status_code=500, detail="コメントの保存に失敗しました")
+        await db.commit()
         
         return CoachCommentResponse(
             section_id=section_id,
@@ -408,10 +418,10 @@ def add_coach_comment(
         raise HTTPException(status_code=500, detail=f"コーチコメントの追加に失敗しました: {str(e)}")
 
 @router.put("/update-section/{section_id}", response_model=SwingSectionResponse)
-def update_swing_section(
+async def update_swing_section(
     section_id: UUID,
     section_update: SwingSectionUpdate,
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_database)
 ):
     """
     Update swing section details
@@ -421,15 +431,16 @@ def update_swing_section(
     """
     try:
         # Verify section exists
-        section = swing_section_crud.get_section(db, section_id)
+        section = await swing_section_crud.get_section(db, section_id)
         if not section:
             raise HTTPException(status_code=404, detail="セクションが見つかりません")
         
         # Update section
-        updated_section = swing_section_crud.update_section(db, section_id, section_update)
+        updated_section = await swing_section_crud.update_section(db, section_id, section_update)
         
         if not updated_section:
             raise HTTPException(status_code=500, detail="セクションの更新に失敗しました")
+        await db.commit()
         
         return updated_section
         
@@ -439,9 +450,9 @@ def update_swing_section(
         raise HTTPException(status_code=500, detail=f"セクションの更新に失敗しました: {str(e)}")
 
 @router.get("/section/{section_id}", response_model=SwingSectionResponse)
-def get_swing_section(
+async def get_swing_section(
     section_id: UUID,
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_database)
 ):
     """
     Get swing section details
@@ -449,7 +460,7 @@ def get_swing_section(
     - **section_id**: ID of the section
     """
     try:
-        section = swing_section_crud.get_section(db, section_id)
+        section = await swing_section_crud.get_section(db, section_id)
         if not section:
             raise HTTPException(status_code=404, detail="セクションが見つかりません")
         
@@ -461,9 +472,9 @@ def get_swing_section(
         raise HTTPException(status_code=500, detail=f"セクション情報の取得に失敗しました: {str(e)}")
 
 @router.get("/sections/{section_group_id}", response_model=List[SwingSectionResponse])
-def get_sections_by_group(
+async def get_sections_by_group(
     section_group_id: UUID,
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_database)
 ):
     """
     Get all sections for a section group
@@ -471,16 +482,16 @@ def get_sections_by_group(
     - **section_group_id**: ID of the section group
     """
     try:
-        sections = swing_section_crud.get_sections_by_group(db, section_group_id)
+        sections = await swing_section_crud.get_sections_by_group(db, section_group_id)
         return sections
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"セクション一覧の取得に失敗しました: {str(e)}")
 
 @router.delete("/section/{section_id}")
-def delete_swing_section(
+async def delete_swing_section(
     section_id: UUID,
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_database)
 ):
     """
     Delete a swing section
@@ -489,21 +500,23 @@ def delete_swing_section(
     """
     try:
         # Get section to retrieve image URL for cleanup
-        section = swing_section_crud.get_section(db, section_id)
+        section = await swing_section_crud.get_section(db, section_id)
         if not section:
             raise HTTPException(status_code=404, detail="セクションが見つかりません")
         
         # Delete image from storage if exists
         if section.image_url:
+            await db.commit()  # ストレージ削除の間は DB 接続を握らない（読み取りのトランザクションを閉じる）
             try:
-                storage_service.delete_file(section.image_url)
+                await run_in_threadpool(storage_service.delete_file, section.image_url)
             except Exception as e:
                 print(f"Warning: Failed to delete section image: {e}")
         
         # Delete section from database
-        success = swing_section_crud.delete_section(db, section_id)
+        success = await swing_section_crud.delete_section(db, section_id)
         if not success:
             raise HTTPException(status_code=404, detail="セクションが見つかりません")
+        await db.commit()
         
         return {"message": "セクションが正常に削除されました"}
         
@@ -513,9 +526,9 @@ def delete_swing_section(
         raise HTTPException(status_code=500, detail=f"セクションの削除に失敗しました: {str(e)}")
 
 @router.post("/analyze-section/{section_id}")
-def analyze_swing_section(
+async def analyze_swing_section(
     section_id: UUID,
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_database)
 ):
     """
     Analyze swing section using AI to suggest tags and insights
@@ -524,7 +537,7 @@ def analyze_swing_section(
     """
     try:
         # Get section data
-        section = swing_section_crud.get_section(db, section_id)
+        section = await swing_section_crud.get_section(db, section_id)
         if not section:
             raise HTTPException(status_code=404, detail="セクションが見つかりません")
         
@@ -537,7 +550,7 @@ def analyze_swing_section(
         }
         
         # Perform AI analysis
-        analysis = ai_service.analyze_swing_section(section_data)
+        analysis = await run_in_threadpool(ai_service.analyze_swing_section, section_data)
         
         return {
             "section_id": section_id,
@@ -552,12 +565,12 @@ def analyze_swing_section(
         raise HTTPException(status_code=500, detail=f"セクション分析に失敗しました: {str(e)}")
 
 @router.post("/add-overall-feedback/{section_group_id}", response_model=OverallFeedbackResponse)
-def add_overall_feedback(
+async def add_overall_feedback(
     section_group_id: UUID,
     audio_file: UploadFile = File(...),
     feedback_type: str = Form(...),  # "overall" or "next_training"
     coach_id: Optional[str] = Form(None),
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_database)
 ):
     """
     Add overall feedback via audio transcription
@@ -569,7 +582,7 @@ def add_overall_feedback(
     """
     try:
         # Verify section group exists
-        section_group = section_group_crud.get_section_group(db, section_group_id)
+        section_group = await section_group_crud.get_section_group(db, section_group_id)
         if not section_group:
             raise HTTPException(status_code=404, detail="セクショングループが見つかりません")
         
@@ -578,21 +591,24 @@ def add_overall_feedback(
             raise HTTPException(status_code=400, detail="フィードバックタイプは 'overall' または 'next_training' である必要があります")
         
         # Validate audio file format
-        if not transcription_service.validate_audio_format(audio_file.file):
+        if not await run_in_threadpool(transcription_service.validate_audio_format, audio_file.file):
             raise HTTPException(status_code=400, detail="サポートされていない音声ファイル形式です")
         
+        # 文字起こし・AI 要約（外部 API）の間は DB 接続を握らないよう、読み取りのトランザクションを閉じておく
+        await db.commit()
+        
         # Transcribe audio to text
         try:
-            transcribed_text = transcription_service.transcribe_audio(audio_file.file)
+            transcribed_text = await run_in_threadpool(transcription_service.transcribe_audio, audio_file.file)
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"音声の文字起こしに失敗しました: {str(e)}")
         
         # Generate summary using AI
         try:
             if feedback_type == "overall":
-                summary = ai_service.summarize_overall_feedback(transcribed_text)
+                summary = await run_in_threadpool(ai_service.summarize_overall_feedback, transcribed_text)
             else:  # next_training
-                summary = ai_service.summarize_training_menu(transcribed_text)
+                summary = await run_in_threadpool(ai_service.summarize_training_menu, transcribed_text)
         except Exception as e:
             # Fallback to simple truncation if AI fails
             print(f"AI summarization failed: {e}")
@@ -600,16 +616,17 @@ def add_overall_feedback(
         
         # Update section group with feedback
         if feedback_type == "overall":
-            updated_section_group = section_group_crud.add_overall_feedback(
+            updated_section_group = await section_group_crud.add_overall_feedback(
                 db, section_group_id, transcribed_text, summary
             )
         else:  # next_training
-            updated_section_group = section_group_crud.add_next_training_menu(
+            updated_section_group = await section_group_crud.add_next_training_menu(
                 db, section_group_id, transcribed_text, summary
             )
         
         if not updated_section_group:
             raise HTTPException(status_code=500, detail="フィードバックの保存に失敗しました")
+        await db.commit()
         
         return OverallFeedbackResponse(
             section_group_id=section_group_id,
@@ -626,9 +643,9 @@ def add_overall_feedback(
         raise HTTPException(status_code=500, detail=f"総評の追加に失敗しました: {str(e)}")
 
 @router.get("/overall-feedback/{section_group_id}", response_model=OverallFeedbackResponse)
-def get_overall_feedback(
+async def get_overall_feedback(
     section_group_id: UUID,
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_database)
 ):
     """
     Get overall feedback for a section group
@@ -636,7 +653,7 @@ def get_overall_feedback(
     - **section_group_id**: ID of the section group
     """
     try:
-        section_group = section_group_crud.get_section_group(db, section_group_id)
+        section_group = await section_group_crud.get_section_group(db, section_group_id)
         if not section_group:
             raise HTTPException(status_code=404, detail="セクショングループが見つかりません")
         
@@ -656,10 +673,10 @@ def get_overall_feedback(
 
 # テキストベースのフィードバック保存API（動画IDベース）
 @router.post("/add-text-feedback/{video_id}")
-def add_text_feedback(
+async def add_text_feedback(
     video_id: UUID,
     feedback_data: TextFeedbackRequest,
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_database)
 ):
     """
     Add text-based feedback for a video
@@ -669,12 +686,12 @@ def add_text_feedback(
     """
     try:
         # 1. 動画の存在確認
-        video = video_crud.get_video(db, video_id)
+        video = await video_crud.get_video(db, video_id)
         if not video:
             raise HTTPException(status_code=404, detail="動画が見つかりません")
         
         # 2. セクショングループを取得または作成
-        section_groups = section_group_crud.get_section_groups_by_video(db, video_id)
+        section_groups = await section_group_crud.get_section_groups_by_video(db, video_id)
         section_group = None
         
         if section_groups:
@@ -686,7 +703,7 @@ def add_text_feedback(
                 video_id=video_id,
                 session_id=f"session_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
             )
-            section_group = section_group_crud.create_section_group(db, section_group_data)
+            section_group = await section_group_crud.create_section_group(db, section_group_data)
         
         if not section_group:
             raise HTTPException(status_code=500, detail="セクショングループの作成に失敗しました")
@@ -702,17 +719,18 @@ def add_text_feedback(
         if feedback_data.next_training_menu_summary is not None:
             update_data['next_training_menu_summary'] = feedback_data.next_training_menu_summary
         
-        update_data['feedback_created_at'] = datetime.datetime.now()
-        
-        # 4. セクショングループを更新
-        updated_section_group = section_group_crud.update_section_group(db, section_group.section_group_id, update_data)
+        # 4. セクショングループを更新（feedback_created_at は CRUD 側で入る）
+        updated_section_group = await section_group_crud.update_feedback(db, section_group.section_group_id, update_data)
         
         if not updated_section_group:
             raise HTTPException(status_code=500, detail="フィードバックの更新に失敗しました")
+        update_data['feedback_created_at'] = updated_section_group.feedback_created_at
         
         # 5. 動画のステータスを「対応済み」に更新
         video_update_data = {"is_reviewed": True}
-        updated_video = video_crud.update_video(db, video_id, video_update_data)
+        updated_video = await video_crud.update_video(db, video_id, video_update_data)
+        # セクショングループ作成・フィードバック・添削済みをまとめて確定させてから応答する
+        await db.commit()
         
         return {
             "message": "フィードバックが正常に保存されました",
@@ -728,9 +746,9 @@ def add_text_feedback(
 
 # フィードバック情報を取得するGETエンドポイント
 @router.get("/get-text-feedback/{video_id}")
-def get_text_feedback(
+async def get_text_feedback(
     video_id: UUID,
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_database)
 ):
     """
     Get text-based feedback for a video
@@ -739,12 +757,12 @@ def get_text_feedback(
     """
     try:
         # 1. 動画の存在確認
-        video = video_crud.get_video(db, video_id)
+        video = await video_crud.get_video(db, video_id)
         if not video:
             raise HTTPException(status_code=404, detail="動画が見つかりません")
         
         # 2. セクショングループからフィードバック情報を取得
-        section_groups = section_group_crud.get_section_groups_by_video(db, video_id)
+        section_groups = await section_group_crud.get_section_groups_by_video(db, video_id)
         
         if not section_groups:
             return {
@@ -780,10 +798,10 @@ def get_text_feedback(
         raise HTTPException(status_code=500, detail=f"フィードバック情報の取得に失敗しました: {str(e)}")
 
 @router.post("/update-video-status/{video_id}")
-def update_video_status(
+async def update_video_status(
     video_id: UUID,
     status_update: VideoStatusUpdateRequest,
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_database)
 ):
     """
     Update the status of a video.
@@ -792,7 +810,7 @@ def update_video_status(
     - **status_update**: New status and feedback_created_at.
     """
     try:
-        video = video_crud.get_video(db, video_id)
+        video = await video_crud.get_video(db, video_id)
         if not video:
             raise HTTPException(status_code=404, detail="動画が見つかりません")
 
@@ -802,10 +820,11 @@ def update_video_status(
         if status_update.feedback_created_at:
             update_data['feedback_created_at'] = datetime.datetime.fromisoformat(status_update.feedback_created_at)
 
-        updated_video = video_crud.update_video(db, video_id, update_data)
+        updated_video = await video_crud.update_video(db, video_id, update_data)
 
         if not updated_video:
             raise HTTPException(status_code=500, detail="動画のステータス更新に失敗しました")
+        await db.commit()
 
         return {
             "message": "動画のステータスが正常に更新されました",
@@ -820,9 +839,9 @@ def update_video_status(
 
 # セクショングループを動画IDで取得するAPI
 @router.get("/get-section-groups-by-video/{video_id}")
-def get_section_groups_by_video(
+async def get_section_groups_by_video(
     video_id: UUID,
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_database)
 ):
     """
     Get section groups by video ID
@@ -831,12 +850,12 @@ def get_section_groups_by_video(
     """
     try:
         # 動画の存在確認
-        video = video_crud.get_video(db, video_id)
+        video = await video_crud.get_video(db, video_id)
         if not video:
             raise HTTPException(status_code=404, detail="動画が見つかりません")
         
         # セクショングループを取得
-        section_groups = section_group_crud.get_section_groups_by_video(db, video_id)
+        section_groups = await section_group_crud.get_section_groups_by_video(db, video_id)
         
         return section_groups
         
@@ -847,10 +866,10 @@ def get_section_groups_by_video(
 
 # セクショングループのフィードバックを更新するAPI
 @router.patch("/update-section-group-feedback/{section_group_id}")
-def update_section_group_feedback(
+async def update_section_group_feedback(
     section_group_id: UUID,
     feedback_data: TextFeedbackRequest,
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_database)
 ):
     """
     Update feedback for a section group
@@ -860,7 +879,7 @@ def update_section_group_feedback(
     """
     try:
         # セクショングループの存在確認
-        section_group = section_group_crud.get_section_group(db, section_group_id)
+        section_group = await section_group_crud.get_section_group(db, section_group_id)
         if not section_group:
             raise HTTPException(status_code=404, detail="セクショングループが見つかりません")
         
@@ -875,13 +894,13 @@ def update_section_group_feedback(
         if feedback_data.next_training_menu_summary is not None:
             update_data['next_training_menu_summary'] = feedback_data.next_training_menu_summary
         
-        update_data['feedback_created_at'] = datetime.datetime.now()
-        
-        # セクショングループを更新
-        updated_section_group = section_group_crud.update_section_group(db, section_group_id, update_data)
+        # セクショングループを更新（feedback_created_at は CRUD 側で入る）
+        updated_section_group = await section_group_crud.update_feedback(db, section_group_id, update_data)
         
         if not updated_section_group:
             raise HTTPException(status_code=500, detail="フィードバックの更新に失敗しました")
+        await db.commit()
+        update_data['feedback_created_at'] = updated_section_group.feedback_created_at
         
         return {
             "message": "フィードバックが正常に更新されました",
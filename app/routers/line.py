@@ -1,194 +1,304 @@
 # app/routers/line.py
 from __future__ import annotations
 
+import asyncio
 import base64
 import hashlib
 import hmac
-import os
+import io
+import tempfile
+import threading
 import uuid
+from types import MappingProxyType
 from datetime import timedelta
-from typing import Any, Dict, Optional
+from typing import Any, BinaryIO, Dict, Optional
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+import httpx
+import orjson
+from cachetools import TTLCache
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.models import User
+from app.crud import user_crud
+from app.schemas.user import UserRegister
 from app.core.config import settings
 from app.core.jwt import create_access_token
-from app.core.security import get_password_hash
 from app.utils.logger import logger
 from app.services.storage import storage_service  # 画像保存で使用（動画はTODO）
+from app.services.blob_proxy import CHUNK_SIZE, get_http_client  # 共有の keep-alive クライアント
 from app.deps import get_database
 
 router = APIRouter()
 
-LINE_CHANNEL_SECRET = os.getenv("LINE_CHANNEL_SECRET")
-LINE_CHANNEL_ACCESS_TOKEN = os.getenv("LINE_CHANNEL_ACCESS_TOKEN")
+LINE_CHANNEL_SECRET = settings.line_channel_secret
+LINE_CHANNEL_ACCESS_TOKEN = settings.line_channel_access_token
 USE_DUMMY = not (LINE_CHANNEL_SECRET and LINE_CHANNEL_ACCESS_TOKEN)
+# 署名検証の HMAC 鍵（リクエスト毎に encode しない）
+_LINE_SECRET_BYTES = (LINE_CHANNEL_SECRET or "").encode("utf-8")
+# LINE API へのリクエストヘッダー（トークンは起動時に決まるので 1 度だけ組み立てる。ダミー運用時は使わない）
+_LINE_AUTH_HEADERS = MappingProxyType({"Authorization": f"Bearer {LINE_CHANNEL_ACCESS_TOKEN}"})
+_LINE_REPLY_HEADERS = MappingProxyType({**_LINE_AUTH_HEADERS, "Content-Type": "application/json"})
+LINE_REPLY_URL = "https://api.line.me/v2/bot/message/reply"
+# LINE API 呼び出しのタイムアウト（秒）。接続は共有クライアントのプールを使い回す
+LINE_TIMEOUT = httpx.Timeout(15.0)
+LINE_REPLY_MAX_MESSAGES = 5
+# 1 回の webhook に含まれるイベント（最大 20 件程度）を同時に処理する上限
+LINE_EVENT_CONCURRENCY = 8
+# webhook 本文の上限。LINE の webhook は通常数 KB なので、これを超えるものは読み切る前に 413 で打ち切る
+LINE_WEBHOOK_MAX_BYTES = 512 * 1024
+# 受信したメディアはこのサイズまでメモリ、超えたら一時ファイルに逃がす（動画は最大 200MB）
+LINE_CONTENT_SPOOL_BYTES = 8 * 1024 * 1024
+
+# line_user_id → user_id の短命キャッシュ（ワーカープロセス単位）。同じ送信者のイベントで毎回 SELECT しない
+_guest_ids: TTLCache = TTLCache(maxsize=10_000, ttl=300)
+_guest_ids_lock = threading.Lock()
 
 
 # ---------------------------
 # ユーティリティ
 # ---------------------------
-def ensure_guest_user(db: Session, line_user_id: str) -> User:
+async def ensure_guest_user(db: AsyncSession, line_user_id: str) -> User:
     """line_user_id で users を検索。なければ guest を自動作成して返す。"""
-    existing = (db.execute(
-        select(User).where(User.line_user_id == line_user_id)
-    )).scalar_one_or_none()
+    return await db.get(User, await ensure_guest_user_id(db, line_user_id))
+
+
+async def ensure_guest_user_id(db: AsyncSession, line_user_id: str) -> uuid.UUID:
+    """webhook 用：user_id だけを確保する（ORM インスタンスは作らない）。"""
+    with _guest_ids_lock:
+        cached = _guest_ids.get(line_user_id)
+    if cached is not None:
+        return cached
+
+    existing = (await db.execute(
+        select(User.user_id).where(User.line_user_id == line_user_id)
+    )).scalars().first()
 
     if existing:
+        with _guest_ids_lock:
+            _guest_ids[line_user_id] = existing
         return existing
 
     # ゲスト作成（emailはユニーク用のダミー、パスワードはランダムのハッシュ）
-    random_pw = get_password_hash(str(uuid.uuid4()))
-    guest = User(
+    # 未 commit の行なのでキャッシュには入れない（次のリクエストで SELECT が当たった時点で入る）
+    # email が line_user_id から一意に決まるので、同時に届いたイベントでも 1 行だけ作られる
+    payload = UserRegister.model_construct(
         username=f"LINE_Guest_{line_user_id[-6:]}",
         email=f"line_{line_user_id}@example.local",
+        password=str(uuid.uuid4()),
+    )
+    return await user_crud.create_user_idempotent(
+        db,
+        payload,
         usertype="guest",
-        password_hash=random_pw,
         line_user_id=line_user_id,
         bio="Created via LINE webhook",
     )
-    db.add(guest)
-    db.commit()
-    db.refresh(guest)
-    return guest
 
 
 def verify_line_signature(body_bytes: bytes, signature_b64: str) -> bool:
     """X-Line-Signature 検証（本番用）。"""
     if USE_DUMMY:
         return True
-    mac = hmac.new(LINE_CHANNEL_SECRET.encode("utf-8"), body_bytes, hashlib.sha256).digest()
-    expected = base64.b64encode(mac).decode("utf-8")
-    return hmac.compare_digest(expected, signature_b64 or "")
+    expected = hmac.new(_LINE_SECRET_BYTES, body_bytes, hashlib.sha256).digest()
+    # ヘッダー側を生の digest に戻して bytes 同士を定数時間で比較する
+    try:
+        received = base64.b64decode(signature_b64 or "", validate=True)
+    except ValueError:
+        return False
+    return hmac.compare_digest(expected, received)
 
 
-def line_get_message_content(message_id: str) -> bytes:
-    """メッセージバイナリを取得（画像/動画/音声）。"""
+async def line_get_message_content(message_id: str) -> BinaryIO:
+    """メッセージバイナリを取得（画像/動画/音声）。
+
+    本文全体を bytes に載せず、チャンクごとに SpooledTemporaryFile へ書き出して先頭に戻したものを返す。
+    そのまま storage_service に渡せる（Azure SDK はファイルからブロック単位でアップロードする）。閉じるのは呼び出し側。
+    """
     if USE_DUMMY:
         # ダミー用: 空のバイト列
-        return b"dummy"
+        return io.BytesIO(b"dummy")
     url = f"https://api-data.line.me/v2/bot/message/{message_id}/content"
-    headers = {"Authorization": f"Bearer {LINE_CHANNEL_ACCESS_TOKEN}"}
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        raise HTTPException(500, f"LINE content fetch failed: {response.status_code} {response.text}")
-    return response.content
-
-
-def line_reply(reply_token: str, texts: list[str]) -> None:
+    async with get_http_client().stream("GET", url, headers=_LINE_AUTH_HEADERS, timeout=LINE_TIMEOUT) as response:
+        if response.status_code != 200:
+            await response.aread()
+            raise HTTPException(500, f"LINE content fetch failed: {response.status_code} {response.text}")
+        spool = tempfile.SpooledTemporaryFile(max_size=LINE_CONTENT_SPOOL_BYTES)
+        try:
+            async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                spool.write(chunk)
+        except BaseException:
+            spool.close()
+            raise
+    spool.seek(0)
+    return spool
+
+
+async def line_reply(reply_token: str, texts: list[str]) -> None:
     """返信テキストを送信。"""
     if USE_DUMMY:
         logger.info(f"[DUMMY] reply -> {texts}")
         return
-    url = "https://api.line.me/v2/bot/message/reply"
-    headers = {
-        "Authorization": f"Bearer {LINE_CHANNEL_ACCESS_TOKEN}",
-        "Content-Type": "application/json",
-    }
+    # 空文字は LINE 側でエラーになるので除き、1 回の reply で送れる上限（5 件）に収める
     payload = {
         "replyToken": reply_token,
-        "messages": [{"type": "text", "text": t[:1000]} for t in texts],
+        "messages": [{"type": "text", "text": t[:1000]} for t in texts if t][:LINE_REPLY_MAX_MESSAGES],
     }
-    response = requests.post(url, headers=headers, json=payload)
+    # orjson で UTF-8 の bytes を直接作る（日本語を \uXXXX にエスケープせず、stdlib json より速い）
+    response = await get_http_client().post(
+        LINE_REPLY_URL, headers=_LINE_REPLY_HEADERS, content=orjson.dumps(payload), timeout=LINE_TIMEOUT
+    )
     if response.status_code != 200:
         logger.warning(f"LINE reply error: {response.status_code} {response.text}")
 
 
+async def handle_event(ev: Dict[str, Any]) -> None:
+    """1 イベント分のメディア取得・保存・返信（webhook の応答後にバックグラウンドで実行。DB は使わない）"""
+    etype = ev.get("type")
+    reply_token = ev.get("replyToken")
+
+    # 返信はイベントごとに 1 回の POST にまとめる（reply token は 1 回しか使えない）
+    texts: list[str] = []
+
+    if etype == "message":
+        msg = ev.get("message", {})
+        mtype = msg.get("type")
+        message_id = msg.get("id")
+
+        # 画像
+        if mtype == "image":
+            try:
+                # 画像保存（Azure Blob）
+                # ファイル名は一意っぽく
+                filename = f"line_img_{message_id}.jpg"
+                # storage_service は画像アップロードAPIがある想定
+                with await line_get_message_content(message_id) as blob:
+                    url = await run_in_threadpool(storage_service.upload_image, blob, filename)  # ファイルのまま渡す
+                texts += ["画像を受け取りました。保存しました。", url]
+            except Exception as e:
+                logger.exception(e)
+                texts = ["画像の保存に失敗しました。"]
+
+        # 動画
+        elif mtype == "video":
+            try:
+                (await line_get_message_content(message_id)).close()
+                # TODO: 動画の保存。storage_service に汎用アップロードが無ければ実装が必要。
+                # いったん保存スキップして受領だけ返信。
+                texts.append("動画を受け取りました。（保存は今はスキップ）")
+            except Exception as e:
+                logger.exception(e)
+                texts = ["動画の取得に失敗しました。"]
+
+        # 音声
+        elif mtype == "audio":
+            try:
+                (await line_get_message_content(message_id)).close()
+                # TODO: audio 保存APIがあれば使う。なければスキップ。
+                texts.append("音声を受け取りました。（保存は今はスキップ）")
+            except Exception as e:
+                logger.exception(e)
+                texts = ["音声の取得に失敗しました。"]
+
+        # テキスト
+        elif mtype == "text":
+            text = msg.get("text", "")
+            # 簡単なハンドリング例
+            if text.strip().lower() == "help":
+                texts += [
+                    "画像・動画・音声を送ると受け取ります。",
+                    "アプリ連携は /api/v1/line/login で行えます。",
+                ]
+            else:
+                texts.append(f"受け取りました: {text}")
+
+        else:
+            texts.append("未対応のメッセージタイプです。")
+
+    else:
+        # follow / unfollow / postback などはここで個別対応可能
+        texts.append("イベントを受け取りました。")
+
+    if reply_token and texts:
+        try:
+            await line_reply(reply_token, texts)
+        except Exception as e:
+            logger.exception(e)
+
+
+async def handle_events(events: list[Dict[str, Any]]) -> None:
+    """バッチ内のイベントを並行に処理する（同時実行数は LINE_EVENT_CONCURRENCY まで）"""
+    sem = asyncio.Semaphore(LINE_EVENT_CONCURRENCY)
+
+    async def run(ev: Dict[str, Any]) -> None:
+        async with sem:
+            await handle_event(ev)
+
+    results = await asyncio.gather(*(run(ev) for ev in events), return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error(f"LINE event handling failed: {result}", exc_info=result)
+
+
 # ---------------------------
 # 1) LINE Webhook（画像/動画受け取り）
 # ---------------------------
 @router.post("/webhook")
-def webhook(
+async def webhook(
     request: Request,
+    background: BackgroundTasks,
     x_line_signature: Optional[str] = Header(None, alias="X-Line-Signature"),
-    db: Session = Depends(get_database),
+    db: AsyncSession = Depends(get_database),
 ):
-    body_bytes = request.body()
+    # 署名ヘッダーが無ければ本文を読む前に弾く（ダミー運用時は署名なしを許可）
+    if not USE_DUMMY and not x_line_signature:
+        raise HTTPException(status_code=400, detail="Invalid signature")
+
+    # 本文サイズの上限（Content-Length を先に見て、無い/偽りの場合も読みながら打ち切る）
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > LINE_WEBHOOK_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Payload too large")
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > LINE_WEBHOOK_MAX_BYTES:
+            raise HTTPException(status_code=413, detail="Payload too large")
+    body_bytes = bytes(body)
 
     # 署名検証
     if not verify_line_signature(body_bytes, x_line_signature or ""):
         raise HTTPException(status_code=400, detail="Invalid signature")
 
-    payload: Dict[str, Any] = request.json()
+    # 検証済みの本文をそのまま orjson でパースする（request.json() による再読込・変換をしない）
+    try:
+        payload: Dict[str, Any] = orjson.loads(body_bytes)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON")
     events = payload.get("events", [])
     logger.info(f"LINE events: {events}")
+    # このバッチ内で確保した user_id（作成直後の未 commit 分を含む）
+    guest_ids: Dict[str, uuid.UUID] = {}
 
     for ev in events:
-        etype = ev.get("type")
         source = ev.get("source", {})
         line_user_id = source.get("userId")
-        reply_token = ev.get("replyToken")
 
         # ゲスト自動作成（なければ）
         if line_user_id:
-            user = ensure_guest_user(db, line_user_id)
-            logger.info(f"guest ensured: user_id={user.user_id}")
-
-        if etype == "message":
-            msg = ev.get("message", {})
-            mtype = msg.get("type")
-            message_id = msg.get("id")
-
-            # 画像
-            if mtype == "image":
-                try:
-                    blob = line_get_message_content(message_id)
-                    # 画像保存（Azure Blob）
-                    # ファイル名は一意っぽく
-                    filename = f"line_img_{message_id}.jpg"
-                    # storage_service は画像アップロードAPIがある想定
-                    url = storage_service.upload_image(io_bytes=blob, filename=filename)  # upload_imageがBytes/IO両対応ならOK
-                    line_reply(reply_token, ["画像を受け取りました。保存しました。", url if url else ""])
-                except Exception as e:
-                    logger.exception(e)
-                    line_reply(reply_token, ["画像の保存に失敗しました。"])
-
-            # 動画
-            elif mtype == "video":
-                try:
-                    blob = line_get_message_content(message_id)
-                    # TODO: 動画の保存。storage_service に汎用アップロードが無ければ実装が必要。
-                    # いったん保存スキップして受領だけ返信。
-                    line_reply(reply_token, ["動画を受け取りました。（保存は今はスキップ）"])
-                except Exception as e:
-                    logger.exception(e)
-                    line_reply(reply_token, ["動画の取得に失敗しました。"])
-
-            # 音声
-            elif mtype == "audio":
-                try:
-                    blob = line_get_message_content(message_id)
-                    # TODO: audio 保存APIがあれば使う。なければスキップ。
-                    line_reply(reply_token, ["音声を受け取りました。（保存は今はスキップ）"])
-                except Exception as e:
-                    logger.exception(e)
-                    line_reply(reply_token, ["音声の取得に失敗しました。"])
-
-            # テキスト
-            elif mtype == "text":
-                text = msg.get("text", "")
-                # 簡単なハンドリング例
-                if text.strip().lower() == "help":
-                    line_reply(reply_token, [
-                        "画像・動画・音声を送ると受け取ります。",
-                        "アプリ連携は /api/v1/line/login で行えます。",
-                    ])
-                else:
-                    line_reply(reply_token, [f"受け取りました: {text}"])
+            user_id = guest_ids.get(line_user_id) or await ensure_guest_user_id(db, line_user_id)
+            guest_ids[line_user_id] = user_id
+            logger.info(f"guest ensured: user_id={user_id}")
 
-            else:
-                line_reply(reply_token, ["未対応のメッセージタイプです。"])
-
-        else:
-            # follow / unfollow / postback などはここで個別対応可能
-            if reply_token:
-                line_reply(reply_token, ["イベントを受け取りました。"])
+    # メディアの取得・保存と返信は応答後に回す（LINE は応答が遅いと再送してくる）。イベント同士は並行に処理する
+    if events:
+        background.add_task(handle_events, events)
 
+    # 応答前に commit して接続をプールへ返す（バックグラウンド処理の間 DB 接続を握らない）
+    await db.commit()
     return {"success": True}
 
 
@@ -201,14 +311,14 @@ class LineLoginRequest(BaseModel):
 
 
 @router.post("/login")
-def line_login(payload: LineLoginRequest, db: Session = Depends(get_database)):
+async def line_login(payload: LineLoginRequest, db: AsyncSession = Depends(get_database)):
     """
     - 本番：id_token を検証 → sub(=line_user_id) 抽出 → ゲスト確保/昇格 → JWT発行
     - 開発：line_user_id を直接受けてゲスト確保 → JWT発行
     """
     # 開発ショートカット
     if payload.line_user_id:
-        user = ensure_guest_user(db, payload.line_user_id)
+        user = await ensure_guest_user(db, payload.line_user_id)
     else:
         # 本番は id_token 検証が必要（ここではダミー対応）
         if USE_DUMMY or not payload.id_token:
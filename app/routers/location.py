@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from typing import List
 from app import models
@@ -9,33 +10,31 @@ from app.schemas.location import LocationResponse, LocationCreate, LocationUpdat
 router = APIRouter(prefix="/locations", tags=["locations"])
 
 @router.get("/", response_model=List[LocationResponse])
-def list_locations(db: Session = Depends(get_database)):
-    from sqlalchemy import select
-    result = db.execute(select(models.Location))
+async def list_locations(db: AsyncSession = Depends(get_database)):
+    result = await db.execute(select(models.Location))
     return result.scalars().all()
 
 @router.get("/{location_id}", response_model=LocationResponse)
-def get_location(location_id: UUID, db: Session = Depends(get_database)):
-    location = db.get(models.Location, str(location_id))
+async def get_location(location_id: UUID, db: AsyncSession = Depends(get_database)):
+    # location_id 列は String(36) なので文字列で主キー検索する
+    location = await db.get(models.Location, str(location_id))
     if not location:
         raise HTTPException(status_code=404, detail="Location not found")
     return location
 
 @router.post("/", response_model=LocationResponse)
-def create_location(location: LocationCreate, db: Session = Depends(get_database)):
-    new_location = models.Location(**location.dict())
+async def create_location(location: LocationCreate, db: AsyncSession = Depends(get_database)):
+    new_location = models.Location(**location.model_dump())
     db.add(new_location)
-    db.commit()
-    db.refresh(new_location)
+    await db.commit()
     return new_location
 
 @router.put("/{location_id}", response_model=LocationResponse)
-def update_location(location_id: UUID, location: LocationUpdate, db: Session = Depends(get_database)):
-    db_location = db.get(models.Location, str(location_id))
+async def update_location(location_id: UUID, location: LocationUpdate, db: AsyncSession = Depends(get_database)):
+    db_location = await db.get(models.Location, str(location_id))
     if not db_location:
         raise HTTPException(status_code=404, detail="Location not found")
-    for key, value in location.dict(exclude_unset=True).items():
+    for key, value in location.model_dump(exclude_unset=True).items():
         setattr(db_location, key, value)
-    db.commit()
-    db.refresh(db_location)
+    await db.commit()
     return db_location
@@ -2,11 +2,13 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from typing import Optional, TYPE_CHECKING
+from fastapi.concurrency import run_in_threadpool
+from typing import BinaryIO, Optional, Tuple, TYPE_CHECKING
 import os
-import tempfile
-import io
-from datetime import datetime
+import re
+import time
+from functools import lru_cache
+import httpx
 from dotenv import load_dotenv
 
 from app.utils.logger import logger
@@ -25,8 +27,24 @@ except Exception:
 load_dotenv()
 
 
+# 直近の秒と、その秒を %Y%m%d%H%M%S に整形した文字列（同じ秒の間は strftime し直さない）
+_stamp_cache: Tuple[int, str] = (0, "")
+
+
+def _timestamp() -> str:
+    """ローカル時刻の秒 + 秒未満のナノ秒（同じ秒に重なったアップロードでも名前が衝突しない）"""
+    global _stamp_cache
+    ns = time.time_ns()
+    sec, sub = divmod(ns, 1_000_000_000)
+    cached_sec, stamp = _stamp_cache
+    if cached_sec != sec:
+        stamp = time.strftime("%Y%m%d%H%M%S", time.localtime(sec))
+        _stamp_cache = (sec, stamp)
+    return f"{stamp}_{sub:09d}"
+
+
 def generate_audio_filename(type: str, video_filename: Optional[str] = None, phase_code: Optional[str] = None) -> str:
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    timestamp = _timestamp()
     if type == "phase_advice" and phase_code:
         return f"{timestamp}_{phase_code}_audio.wav"
     elif type == "advice":
@@ -39,21 +57,71 @@ def generate_audio_filename(type: str, video_filename: Optional[str] = None, pha
 
 router = APIRouter(tags=["transcription"])
 
+# Whisper が無音時に出しがちな定型文（1 本の正規表現にまとめて 1 回の走査で判定する）
+SUSPICIOUS_PHRASES = [
+    "ご視聴ありがとうございました",
+    "ありがとうございました",
+    "Thanks for watching",
+    "Thank you for watching",
+]
+_SUSPICIOUS_RE = re.compile("|".join(map(re.escape, SUSPICIOUS_PHRASES)))
+
 
 def get_openai_client() -> Optional["OpenAIClientType"]:
     """必要なときだけ OpenAI クライアントを初期化（キー未設定なら None）"""
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key or _OpenAIRuntime is None:
         return None
+    return _openai_client_for(api_key)
+
+
+@lru_cache(maxsize=1)
+def _openai_client_for(api_key: str) -> Optional["OpenAIClientType"]:
+    """API キーごとにクライアントを 1 つだけ作り、api.openai.com への keep-alive 接続を使い回す。
+
+    初回リクエスト時（ワーカープロセス内）に作るので、fork 前のソケットを共有しない。
+    """
     try:
-        return _OpenAIRuntime(api_key=api_key)  # 実行時はこちらを使う
+        return _OpenAIRuntime(  # 実行時はこちらを使う
+            api_key=api_key,
+            http_client=httpx.Client(
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                timeout=60,
+            ),
+        )
     except Exception as e:
         logger.warning(f"OpenAI init failed: {e}")
         return None
 
 
+# ---- スレッドプールで実行するブロッキング処理 ----
+# UploadFile は既に SpooledTemporaryFile（大きければディスク上）なので、自前の一時ファイルへは写さずそのまま渡す
+def _whisper_transcribe(client: "OpenAIClientType", audio_file: BinaryIO) -> str:
+    audio_file.seek(0)
+    transcript = client.audio.transcriptions.create(
+        model="whisper-1",
+        # 従来の一時ファイル名と同じく .wav として送る（形式の判定に拡張子が使われる）
+        file=("audio.wav", audio_file),
+        language="ja",
+        prompt="これはゴルフのスイング指導に関する音声です。専門用語や技術的な内容が含まれます。",
+    )
+    return getattr(transcript, "text", "") or ""
+
+
+def _upload_audio(audio_stream: BinaryIO, audio_filename: str) -> Optional[str]:
+    """Blob 保存（メソッド差異にフォールバック）"""
+    audio_stream.seek(0)
+    if hasattr(storage_service, "upload_audio_with_exact_name"):
+        return storage_service.upload_audio_with_exact_name(audio_stream, audio_filename)
+    if hasattr(storage_service, "storage"):
+        return storage_service.storage.upload_file_with_exact_name(
+            audio_stream, audio_filename, content_type="audio/wav"
+        )
+    return storage_service.storage.upload_file(audio_stream, audio_filename, content_type="audio/wav")
+
+
 @router.post("/transcribe-audio")
-def transcribe_audio(
+async def transcribe_audio(
     audio: UploadFile = File(...),
     type: Optional[str] = Form("general"),
     video_filename: Optional[str] = Form(None),
@@ -67,95 +135,59 @@ def transcribe_audio(
             logger.error(f"無効なファイル形式: {audio.content_type}")
             raise HTTPException(status_code=400, detail="音声ファイルをアップロードしてください")
 
-        # 一時ファイルへ保存
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-            temp_file_path = temp_file.name
-            audio_content = audio.read()
-            temp_file.write(audio_content)
-            temp_file.flush()
-
-        try:
-            file_size = os.path.getsize(temp_file_path)
-            logger.info(f"一時ファイル作成: {temp_file_path} / {file_size} bytes")
-            if file_size < 1000:
-                logger.warning(f"音声ファイルサイズが小さすぎます: {file_size} bytes")
-                return {
-                    "success": False,
-                    "transcription": "音声データが検出されませんでした。録音時間が短すぎるか、マイクの音量が低い可能性があります。",
-                    "type": type,
-                    "audio_url": None,
-                    "audio_filename": None,
-                    "audio_duration": None,
-                }
-
-            client = get_openai_client()
-            if client is None:
-                logger.warning("OpenAI APIキー未設定/初期化失敗。ダミーの文字起こし結果を返します。")
-                return {
-                    "success": True,
-                    "transcription": "OpenAI APIキーが設定されていないため、ダミーの文字起こし結果です。実際の音声を文字起こしするには、環境変数OPENAI_API_KEYを設定してください。",
-                    "type": type,
-                    "audio_url": None,
-                    "audio_filename": None,
-                    "audio_duration": None,
-                }
-
-            # Whisper で文字起こし
-            logger.info("Whisper APIで文字起こし中...")
-            with open(temp_file_path, "rb") as audio_file:
-                transcript = client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    language="ja",
-                    prompt="これはゴルフのスイング指導に関する音声です。専門用語や技術的な内容が含まれます。",
-                )
-            transcription_text = getattr(transcript, "text", "") or ""
-
-            # 怪しい結果の簡易フィルタ
-            suspicious_phrases = [
-                "ご視聴ありがとうございました",
-                "ありがとうございました",
-                "Thanks for watching",
-                "Thank you for watching",
-            ]
-            if any(p in transcription_text for p in suspicious_phrases):
-                logger.warning(f"疑わしい文字起こし結果: {transcription_text}")
-                transcription_text = "録音された音声が検出されませんでした。マイクの設定を確認して、もう一度録音してください。"
-
-            # Blob 保存（メソッド差異にフォールバック）
-            audio_url = None
-            audio_filename = generate_audio_filename(type or "general", video_filename, phase_code)
-            try:
-                audio_stream = io.BytesIO(audio_content)
-                if hasattr(storage_service, "upload_audio_with_exact_name"):
-                    audio_url = storage_service.upload_audio_with_exact_name(audio_stream, audio_filename)
-                elif hasattr(storage_service, "storage"):
-                    audio_url = storage_service.storage.upload_file_with_exact_name(
-                        audio_stream, audio_filename, content_type="audio/wav"
-                    )
-                else:
-                    audio_url = storage_service.storage.upload_file(
-                        audio_stream, audio_filename, content_type="audio/wav"
-                    )
-                logger.info(f"音声ファイル保存完了: {audio_url}")
-            except Exception as e:
-                logger.warning(f"音声ファイル保存失敗: {e}（文字起こしは成功）")
+        file_size = audio.size
+        if file_size is None:
+            file_size = audio.file.seek(0, os.SEEK_END)
+        logger.info(f"受信した音声: {file_size} bytes")
+        if file_size < 1000:
+            logger.warning(f"音声ファイルサイズが小さすぎます: {file_size} bytes")
+            return {
+                "success": False,
+                "transcription": "音声データが検出されませんでした。録音時間が短すぎるか、マイクの音量が低い可能性があります。",
+                "type": type,
+                "audio_url": None,
+                "audio_filename": None,
+                "audio_duration": None,
+            }
 
+        client = get_openai_client()
+        if client is None:
+            logger.warning("OpenAI APIキー未設定/初期化失敗。ダミーの文字起こし結果を返します。")
             return {
                 "success": True,
-                "transcription": transcription_text,
+                "transcription": "OpenAI APIキーが設定されていないため、ダミーの文字起こし結果です。実際の音声を文字起こしするには、環境変数OPENAI_API_KEYを設定してください。",
                 "type": type,
-                "audio_url": audio_url,
-                "audio_filename": audio_filename,
+                "audio_url": None,
+                "audio_filename": None,
                 "audio_duration": None,
             }
 
-        finally:
-            try:
-                os.unlink(temp_file_path)
-                logger.info(f"一時ファイル削除: {temp_file_path}")
-            except Exception as e:
-                logger.warning(f"一時ファイル削除失敗: {e}")
+        # Whisper で文字起こし
+        logger.info("Whisper APIで文字起こし中...")
+        transcription_text = await run_in_threadpool(_whisper_transcribe, client, audio.file)
+
+        # 怪しい結果の簡易フィルタ
+        if _SUSPICIOUS_RE.search(transcription_text):
+            logger.warning(f"疑わしい文字起こし結果: {transcription_text}")
+            transcription_text = "録音された音声が検出されませんでした。マイクの設定を確認して、もう一度録音してください。"
+
+        # Blob 保存
+        audio_url = None
+        audio_filename = generate_audio_filename(type or "general", video_filename, phase_code)
+        try:
+            audio_url = await run_in_threadpool(_upload_audio, audio.file, audio_filename)
+            logger.info(f"音声ファイル保存完了: {audio_url}")
+        except Exception as e:
+            logger.warning(f"音声ファイル保存失敗: {e}（文字起こしは成功）")
+
+        return {
+            "success": True,
+            "transcription": transcription_text,
+            "type": type,
+            "audio_url": audio_url,
+            "audio_filename": audio_filename,
+            "audio_duration": None,
+        }
 
     except HTTPException:
         raise
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from uuid import UUID
 import uuid
@@ -8,25 +8,24 @@ import os
 import shutil
 import traceback
 import requests
-import io
 import subprocess
 import tempfile
-from azure.storage.blob import BlobServiceClient, generate_blob_sas, BlobSasPermissions
 from datetime import datetime, timedelta
-from dotenv import load_dotenv
 
 from app.deps import get_database, get_default_user_id
 from app.schemas.video import VideoResponse, VideoUploadRequest
 from app.crud import video_crud
-from app.services.storage import storage_service
+from app.services.blob_proxy import stream_blob
+from app.services.storage import blob_name_from_url, generate_read_sas_url, storage_service
 from app.services.thumbnail import thumbnail_service
-from app.models import Video, Base, engine
+from app.database import engine
+from app.models import Video, Base
 from app.utils.logger import logger
 
 router = APIRouter()
 
 @router.post("/upload-video", response_model=VideoResponse)
-def upload_video(
+async def upload_video(
     video_file: UploadFile = File(...),
     thumbnail_file: Optional[UploadFile] = File(None),
     club_type: Optional[str] = Form(None),
@@ -34,7 +33,7 @@ def upload_video(
     swing_note: Optional[str] = Form(None),
     user_email: Optional[str] = Form(None),
     user_id: Optional[str] = Form(None),
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_database)
 ):
     """
     Upload golf swing video
@@ -63,11 +62,12 @@ def upload_video(
             from sqlalchemy import select
             
             user_query = select(User).where(User.email == user_email)
-            user_result = db.execute(user_query)
+            user_result = await db.execute(user_query)
             user = user_result.scalar_one_or_none()
             
             if user:
                 actual_user_id = str(user.user_id)
+                await db.commit()  # 動画アップロードの間は DB 接続を握らない（読み取りのトランザクションを閉じる）
                 logger.info(f"メールアドレスからユーザーIDを取得: {actual_user_id}")
             else:
                 logger.error(f"メールアドレス {user_email} に対応するユーザーが見つかりません")
@@ -83,15 +83,16 @@ def upload_video(
         logger.info(f"最終的なユーザーID: {actual_user_id}")
         
         # Read video content once for both upload and thumbnail generation
-        video_file.file.seek(0)
-        video_content = video_file.file.read()
+        await video_file.seek(0)
+        video_content = await video_file.read()
         logger.info(f"動画データ読み込み完了: {len(video_content)} bytes")
         
         # Upload video to storage
         from io import BytesIO
         video_bytes_for_upload = BytesIO(video_content)
         logger.info("動画をストレージにアップロード中...")
-        video_url = storage_service.upload_video(
+        video_url = await run_in_threadpool(
+            storage_service.upload_video,
             video_bytes_for_upload,
             video_file.filename or "video.mp4"
         )
@@ -109,13 +110,14 @@ def upload_video(
                 logger.info("フロントエンドから送信されたサムネイルを使用")
                 
                 # ファイルの内容を読み込み
-                thumbnail_content = thumbnail_file.file.read()
+                thumbnail_content = await thumbnail_file.read()
                 logger.info(f"サムネイルファイル読み込み完了: {len(thumbnail_content)} bytes")
                 
                 # ファイルポインタを先頭に戻す
-                thumbnail_file.file.seek(0)
+                await thumbnail_file.seek(0)
                 
-                thumbnail_url = storage_service.upload_image_with_exact_name(
+                thumbnail_url = await run_in_threadpool(
+                    storage_service.upload_image_with_exact_name,
                     thumbnail_content,
                     f"{thumbnail_base_name}.jpg"
                 )
@@ -145,7 +147,7 @@ def upload_video(
                     logger.info(f"Blobパス: {blob_path}")
                     
                     # ファイルの存在確認（list_filesで確認）
-                    files = storage_service.list_files(prefix=blob_path)
+                    files = await run_in_threadpool(storage_service.list_files, prefix=blob_path)
                     logger.info(f"Blob存在確認結果: {files}")
                     
                 except Exception as blob_error:
@@ -156,7 +158,8 @@ def upload_video(
                 # Create BytesIO object for thumbnail generation
                 video_bytes_for_thumbnail = BytesIO(video_content)
                 
-                thumbnail_data = thumbnail_service.generate_thumbnail(
+                thumbnail_data = await run_in_threadpool(
+                    thumbnail_service.generate_thumbnail,
                     video_bytes_for_thumbnail,
                     video_file.filename or "video.mp4"
                 )
@@ -164,7 +167,8 @@ def upload_video(
                 
                 # Upload thumbnail with same base name as video
                 thumbnail_filename = f"{thumbnail_base_name}.jpg"
-                thumbnail_url = storage_service.upload_image_with_exact_name(
+                thumbnail_url = await run_in_threadpool(
+                    storage_service.upload_image_with_exact_name,
                     thumbnail_data,
                     thumbnail_filename
                 )
@@ -194,7 +198,7 @@ def upload_video(
             # 実際のBlobにアクセス可能かテスト
             try:
                 import requests
-                test_response = requests.head(thumbnail_url, timeout=5)
+                test_response = await run_in_threadpool(requests.head, thumbnail_url, timeout=5)
                 logger.info(f"サムネイルURLアクセステスト: {test_response.status_code}")
                 if test_response.status_code == 200:
                     logger.info("✅ サムネイルURLは正常にアクセス可能")
@@ -208,7 +212,8 @@ def upload_video(
         # Create video in database
         from app.schemas import VideoCreate
         video_create = VideoCreate(**video_data)
-        db_video = video_crud.create_video(db, video_create)
+        db_video = await video_crud.create_video(db, video_create)
+        await db.commit()
         logger.info(f"データベース保存完了: video_id={db_video.video_id}")
         
         return db_video
@@ -222,10 +227,10 @@ def upload_video(
         raise HTTPException(status_code=500, detail=f"動画のアップロードに失敗しました: {str(e)}")
 
 @router.post("/upload-thumbnail/{video_id}")
-def upload_thumbnail(
+async def upload_thumbnail(
     video_id: UUID,
     thumbnail_file: UploadFile = File(...),
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_database)
 ):
     """
     Upload thumbnail image for a video
@@ -235,7 +240,7 @@ def upload_thumbnail(
     """
     try:
         # Check if video exists
-        video = video_crud.get_video(db, video_id)
+        video = await video_crud.get_video(db, video_id)
         if not video:
             raise HTTPException(status_code=404, detail="動画が見つかりません")
         
@@ -243,8 +248,10 @@ def upload_thumbnail(
         if not thumbnail_file.content_type or not thumbnail_file.content_type.startswith('image/'):
             raise HTTPException(status_code=400, detail="アップロードされたファイルは画像ファイルである必要があります")
         
-        # Upload thumbnail to storage
-        thumbnail_url = storage_service.upload_image(
+        # Upload thumbnail to storage（アップロードの間は DB 接続を握らないよう、読み取りのトランザクションを閉じておく）
+        await db.commit()
+        thumbnail_url = await run_in_threadpool(
+            storage_service.upload_image,
             thumbnail_file.file,
             thumbnail_file.filename or "thumbnail.jpg"
         )
@@ -252,7 +259,8 @@ def upload_thumbnail(
         # Update video with thumbnail URL
         from app.schemas import VideoUpdate
         video_update = VideoUpdate(thumbnail_url=thumbnail_url)
-        updated_video = video_crud.update_video(db, video_id, video_update)
+        updated_video = await video_crud.update_video(db, video_id, video_update)
+        await db.commit()
         
         return {
             "message": "サムネイルが正常にアップロードされました",
@@ -266,9 +274,9 @@ def upload_thumbnail(
         raise HTTPException(status_code=500, detail=f"サムネイルのアップロードに失敗しました: {str(e)}")
 
 @router.get("/upload-status/{video_id}")
-def get_upload_status(
+async def get_upload_status(
     video_id: UUID,
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_database)
 ):
     """
     Get upload status and video information
@@ -276,7 +284,7 @@ def get_upload_status(
     - **video_id**: ID of the video
     """
     try:
-        video = video_crud.get_video_with_sections(db, video_id)
+        video = await video_crud.get_video_with_sections(db, video_id)
         if not video:
             raise HTTPException(status_code=404, detail="動画が見つかりません")
         
@@ -298,9 +306,9 @@ def get_upload_status(
         raise HTTPException(status_code=500, detail=f"アップロード状況の取得に失敗しました: {str(e)}")
 
 @router.delete("/video/{video_id}")
-def delete_video(
+async def delete_video(
     video_id: UUID,
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_database)
 ):
     """
     Delete a video and its associated files
@@ -309,22 +317,24 @@ def delete_video(
     """
     try:
         # Get video to retrieve file URLs
-        video = video_crud.get_video(db, video_id)
+        video = await video_crud.get_video(db, video_id)
         if not video:
             raise HTTPException(status_code=404, detail="動画が見つかりません")
         
-        # Delete files from storage
+        # Delete files from storage（削除の間は DB 接続を握らないよう、読み取りのトランザクションを閉じておく）
+        await db.commit()
         try:
-            storage_service.delete_file(video.video_url)
+            await run_in_threadpool(storage_service.delete_file, video.video_url)
             if video.thumbnail_url:
-                storage_service.delete_file(video.thumbnail_url)
+                await run_in_threadpool(storage_service.delete_file, video.thumbnail_url)
         except Exception as e:
             print(f"Warning: Failed to delete files from storage: {e}")
         
         # Delete video record from database
-        success = video_crud.delete_video(db, video_id)
+        success = await video_crud.delete_video(db, video_id)
         if not success:
             raise HTTPException(status_code=404, detail="動画が見つかりません")
+        await db.commit()
         
         return {"message": "動画が正常に削除されました"}
         
@@ -335,8 +345,8 @@ def delete_video(
 
 
 @router.post("/clear-all-data")
-def clear_all_data(
-    db: Session = Depends(get_database)
+async def clear_all_data(
+    db: AsyncSession = Depends(get_database)
 ):
     """
     Clear all video data and uploaded files
@@ -344,9 +354,9 @@ def clear_all_data(
     """
     try:
         # Delete all database tables and recreate them
-        with engine.begin() as conn:
-            conn.run_sync(Base.metadata.drop_all)
-            conn.run_sync(Base.metadata.create_all)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
         
         # Clear uploads directory
         uploads_dir = "uploads"
@@ -361,7 +371,7 @@ def clear_all_data(
 
 
 @router.get("/proxy-file/{file_url:path}")
-def proxy_file(file_url: str):
+async def proxy_file(file_url: str):
     """
     Azure Blob Storage ファイルをプロキシ経由で配信
     CORS問題を回避するためのエンドポイント
@@ -378,45 +388,27 @@ def proxy_file(file_url: str):
         logger.info(f"Proxying file: {decoded_url}")
         
         # Get fresh SAS URL for the file first
-        blob_service_client = BlobServiceClient.from_connection_string(os.getenv("AZURE_STORAGE_CONNECTION_STRING"))
         container_name = os.getenv("AZURE_STORAGE_CONTAINER", "bbc-test")
         
-        # Extract filename from URL
-        filename = decoded_url.split('/')[-1].split('?')[0]  # Remove any existing SAS parameters
-        
-        # Generate fresh SAS token
-        sas_token = generate_blob_sas(
-            account_name=blob_service_client.account_name,
-            container_name=container_name,
-            blob_name=filename,
-            account_key=blob_service_client.credential.account_key,
-            permission=BlobSasPermissions(read=True),
-            expiry=datetime.utcnow() + timedelta(hours=2)
-        )
-        
-        # Create SAS URL
-        sas_url = f"https://{blob_service_client.account_name}.blob.core.windows.net/{container_name}/{filename}?{sas_token}"
-        
-        # 同期でファイルを取得
-        response = requests.get(sas_url)
-        if response.status_code != 200:
-            raise HTTPException(status_code=404, detail="File not found")
+        # Extract blob name from URL (existing SAS parameters are ignored)
+        filename = blob_name_from_url(decoded_url)
         
-        # Content-Typeを取得
-        content_type = response.headers.get('content-type', 'application/octet-stream')
-        
-        # ファイルコンテンツを読み取り
-        content = response.content
+        # SAS URL（2時間。発行済みで残り時間が十分ならキャッシュから返す）
+        sas_url = generate_read_sas_url(
+            os.getenv("AZURE_STORAGE_CONNECTION_STRING"), container_name, filename, timedelta(hours=2)
+        )
         
-        return StreamingResponse(
-            io.BytesIO(content),
-            media_type=content_type,
+        # 取得しながらそのまま流す（全体をメモリに読み込まない）
+        return await stream_blob(
+            sas_url,
             headers={
                 "Cache-Control": "public, max-age=3600",  # 1時間キャッシュ
                 "Access-Control-Allow-Origin": "*",
                 "Access-Control-Allow-Methods": "GET",
                 "Access-Control-Allow-Headers": "*"
-            }
+            },
+            error_status=404,
+            error_detail="File not found",
         )
         
     except HTTPException:
@@ -432,8 +424,7 @@ def get_media_url(blob_url: str):
     Azure Blob URLからSAS付きURLを生成
     """
     try:
-        # Azure Blob設定を取得
-        load_dotenv()
+        # Azure Blob設定を取得（.env は起動時に読み込み済み）
         connection_string = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
         container_name = os.getenv("AZURE_STORAGE_CONTAINER", "bbc-test")
         
@@ -445,25 +436,11 @@ def get_media_url(blob_url: str):
         if not blob_url.startswith('https://') or 'blob.core.windows.net' not in blob_url:
             raise HTTPException(status_code=400, detail="無効なBlob URL")
         
-        # URLからファイル名を抽出
-        url_parts = blob_url.split('/')
-        filename = url_parts[-1]
-        
-        # Blob Service Clientを作成
-        blob_service_client = BlobServiceClient.from_connection_string(connection_string)
-        
-        # SASトークンを生成（2時間有効）
-        sas_token = generate_blob_sas(
-            account_name=blob_service_client.account_name,
-            container_name=container_name,
-            blob_name=filename,
-            account_key=blob_service_client.credential.account_key,
-            permission=BlobSasPermissions(read=True),
-            expiry=datetime.utcnow() + timedelta(hours=2)
-        )
+        # URLからファイル名（コンテナ配下のパス）を抽出
+        filename = blob_name_from_url(blob_url)
         
-        # SAS付きURLを生成
-        sas_url = f"https://{blob_service_client.account_name}.blob.core.windows.net/{container_name}/{filename}?{sas_token}"
+        # SAS付きURLを生成（2時間有効。発行済みで残り時間が十分ならキャッシュから返す）
+        sas_url = generate_read_sas_url(connection_string, container_name, filename, timedelta(hours=2))
         
         return {"url": sas_url}
         
@@ -480,29 +457,15 @@ def get_media_url_simple(filename: str):
     ファイル名からSAS付きURLを生成（シンプル版）
     """
     try:
-        # Azure Blob設定を取得
-        load_dotenv()
+        # Azure Blob設定を取得（.env は起動時に読み込み済み）
         connection_string = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
         container_name = os.getenv("AZURE_STORAGE_CONTAINER", "bbc-test")
         
         if not connection_string:
             raise HTTPException(status_code=500, detail="Azure接続設定が見つかりません")
         
-        # Blob Service Clientを作成
-        blob_service_client = BlobServiceClient.from_connection_string(connection_string)
-        
-        # SASトークンを生成（2時間有効）
-        sas_token = generate_blob_sas(
-            account_name=blob_service_client.account_name,
-            container_name=container_name,
-            blob_name=filename,
-            account_key=blob_service_client.credential.account_key,
-            permission=BlobSasPermissions(read=True),
-            expiry=datetime.utcnow() + timedelta(hours=2)
-        )
-        
-        # SAS付きURLを生成
-        sas_url = f"https://{blob_service_client.account_name}.blob.core.windows.net/{container_name}/{filename}?{sas_token}"
+        # SAS付きURLを生成（2時間有効。発行済みで残り時間が十分ならキャッシュから返す）
+        sas_url = generate_read_sas_url(connection_string, container_name, filename, timedelta(hours=2))
         
         return {"url": sas_url}
         
@@ -592,7 +555,7 @@ def capture_video_frame(
             # Azure Blob Storageにアップロード（正確なファイル名で保存）
             logger.info("Azure Blob Storageにアップロード中...")
             image_url = storage_service.upload_image_with_exact_name(
-                io.BytesIO(image_data),
+                image_data,
                 filename
             )
             
@@ -658,7 +621,7 @@ def upload_markup_image(
         # Azure Blob Storageにアップロード
         logger.info("Azure Blob Storageにアップロード中...")
         image_url = storage_service.upload_image_with_exact_name(
-            io.BytesIO(image_bytes),
+            image_bytes,
             filename
         )
         
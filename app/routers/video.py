@@ -1,40 +1,43 @@
 # app/routers/video.py
 from __future__ import annotations
 
+from itertools import islice
 from typing import List, Optional, Dict, Any
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.deps import get_database, get_default_user_id
 from app.schemas.video import (
     VideoResponse,
     VideoWithSectionsResponse,
-    SectionGroupResponse,
-    SwingSectionResponse,
+    dump_video_list_json,
 )
-from app.crud import video_crud, section_group_crud, swing_section_crud
+from app.crud import video_crud, section_group_crud, swing_section_crud, video_views
 from app.schemas.section import (
     CoachingSessionCreate,
     CoachingSessionUpdate,
     CoachingSessionResponse,
 )
 from app import models
+from app.utils.logger import logger
 from sqlalchemy import select
 
 router = APIRouter(tags=["videos"])
 
+
 @router.get("/video/{video_id}", response_model=VideoResponse)
-def get_video_details(
+async def get_video_details(
     video_id: UUID,
-    db: Session = Depends(get_database),
+    db: AsyncSession = Depends(get_database),
 ):
     """
     Get detailed information about a specific video
     """
     try:
-        video = video_crud.get_video(db, video_id)
+        video = await video_crud.get_video(db, video_id)
         if not video:
             raise HTTPException(status_code=404, detail="動画が見つかりません")
         return video
@@ -44,47 +47,52 @@ def get_video_details(
         raise HTTPException(status_code=500, detail=f"動画詳細の取得に失敗しました: {str(e)}")
 
 @router.get("/video/{video_id}/with-sections", response_model=VideoWithSectionsResponse)
-def get_video_with_sections(
+async def get_video_with_sections(
     video_id: UUID,
-    db: Session = Depends(get_database),
+    db: AsyncSession = Depends(get_database),
 ):
     """
     Get video with all coaching sections and comments
     """
     try:
-        video = video_crud.get_video_with_sections(db, video_id)
+        key = ("with-sections", video_id)
+        cached = video_views.get(key)
+        if cached is not None:
+            return ORJSONResponse(cached)
+        generation = video_views.generation
+
+        video = await video_crud.get_video_with_sections(db, video_id)
         if not video:
             raise HTTPException(status_code=404, detail="動画が見つかりません")
 
-        # 最初の SectionGroup を選択（なければ None）
-        section_group = video.section_groups[0] if video.section_groups else None
-
-        # VideoResponse をベースに合成
-        base = VideoResponse.model_validate(video, from_attributes=True).model_dump()
-        response = {
-            **base,
-            "section_groups": [SectionGroupResponse.model_validate(sg, from_attributes=True).model_dump() for sg in video.section_groups] if video.section_groups else [],
-            "sections": [
-                SwingSectionResponse.model_validate(s, from_attributes=True).model_dump()
-                for s in (section_group.sections if section_group else [])
-            ],
-        }
-        return response
+        # sections は Video.sections（最初の SectionGroup のセクション）から読むので、ORM から 1 回の検証で組み立てる。
+        # 戻り値をモデルのまま FastAPI に渡すと dict 化 → 再検証が走るので、ここで JSON 用に 1 回だけ dump する
+        response = VideoWithSectionsResponse.model_validate(video, from_attributes=True)
+        payload = response.model_dump(mode="json", by_alias=True)
+        video_views.put(key, payload, generation)
+        return ORJSONResponse(payload)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"動画とセクション情報の取得に失敗しました: {str(e)}")
 
 @router.get("/video/{video_id}/feedback-summary")
-def get_video_feedback_summary(
+async def get_video_feedback_summary(
     video_id: UUID,
-    db: Session = Depends(get_database),
+    db: AsyncSession = Depends(get_database),
 ):
     """
     Summarize feedback for a video
     """
     try:
-        video = video_crud.get_video_with_sections(db, video_id)
+        key = ("feedback-summary", video_id)
+        cached = video_views.get(key)
+        if cached is not None:
+            return cached
+        generation = video_views.generation
+
+        # 要約では投稿者を使わないので users の JOIN は省く
+        video = await video_crud.get_video_with_sections(db, video_id, with_user=False)
         if not video:
             raise HTTPException(status_code=404, detail="動画が見つかりません")
 
@@ -136,6 +144,7 @@ def get_video_feedback_summary(
 
                     feedback_summary["feedback_sections"].append(section_data)
 
+        video_views.put(key, feedback_summary, generation)
         return feedback_summary
     except HTTPException:
         raise
@@ -143,10 +152,10 @@ def get_video_feedback_summary(
         raise HTTPException(status_code=500, detail=f"フィードバック要約の取得に失敗しました: {str(e)}")
 
 @router.get("/videos", response_model=List[VideoResponse])
-def get_all_videos(
+async def get_all_videos(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
-    db: Session = Depends(get_database),
+    db: AsyncSession = Depends(get_database),
 ):
     """
     Get all videos for coach dashboard (all users)
@@ -154,19 +163,24 @@ def get_all_videos(
     try:
         # sections を一緒にロードしたいときは get_all_videos_with_sections を使うが、
         # レスポンスモデルが VideoResponse のためここでは基本情報のみ返す想定
-        videos = video_crud.get_all_videos_with_sections(db, skip, limit)
-        # VideoResponse でシリアライズできるのでそのまま返却
-        return videos
+        key = ("all", skip, limit)
+        payload = video_views.get(key)
+        if payload is None:
+            generation = video_views.generation
+            videos = await video_crud.get_all_videos_with_sections(db, skip, limit)
+            payload = dump_video_list_json(videos)
+            video_views.put(key, payload, generation)
+        return Response(payload, media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"全動画一覧の取得に失敗しました: {str(e)}")
 
 @router.get("/videos/search")
-def search_videos(
+async def search_videos(
     user_id: Optional[str] = Query(None, description="User ID (uses default if not provided)"),
     club_type: Optional[str] = Query(None, description="Filter by club type"),
     swing_form: Optional[str] = Query(None, description="Filter by swing form"),
     has_feedback: Optional[bool] = Query(None, description="Filter videos with/without feedback"),
-    db: Session = Depends(get_database),
+    db: AsyncSession = Depends(get_database),
 ):
     """
     Search and filter videos based on criteria
@@ -174,20 +188,10 @@ def search_videos(
     try:
         actual_user_id = user_id if user_id else get_default_user_id()
 
-        # ユーザーの全動画（必要に応じて最適化可）
-        videos = video_crud.get_videos_by_user(db, UUID(actual_user_id))
-
-        filtered = []
-        for v in videos:
-            if club_type and v.club_type != club_type:
-                continue
-            if swing_form and v.swing_form != swing_form:
-                continue
-            if has_feedback is not None:
-                has_sections = bool(v.section_groups)
-                if has_feedback != has_sections:
-                    continue
-            filtered.append(v)
+        filtered = await video_crud.search_videos(
+            db, UUID(actual_user_id),
+            club_type=club_type, swing_form=swing_form, has_feedback=has_feedback,
+        )
 
         return {
             "total_found": len(filtered),
@@ -204,31 +208,36 @@ def search_videos(
         raise HTTPException(status_code=500, detail=f"動画検索に失敗しました: {str(e)}")
 
 @router.get("/user/{user_id}/videos", response_model=List[VideoResponse])
-def get_user_videos(
+async def get_user_videos(
     user_id: UUID,
-    db: Session = Depends(get_database),
+    db: AsyncSession = Depends(get_database),
 ):
     """
     ユーザー固有の動画一覧を取得
     """
     try:
-        videos = video_crud.get_videos_by_user(db, user_id)
-        if not videos:
-            return []
-        return videos
+        key = ("user", user_id)
+        payload = video_views.get(key)
+        if payload is None:
+            generation = video_views.generation
+            videos = await video_crud.get_videos_by_user(db, user_id)
+            payload = dump_video_list_json(videos)
+            video_views.put(key, payload, generation)
+        return Response(payload, media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"ユーザー動画一覧の取得に失敗しました: {str(e)}")
 
 @router.get("/user/{user_id}/videos/summary")
-def get_user_videos_summary(
+async def get_user_videos_summary(
     user_id: UUID,
-    db: Session = Depends(get_database),
+    db: AsyncSession = Depends(get_database),
 ):
     """
     ユーザーの動画一覧のサマリー情報を取得（ホーム画面用）
     """
     try:
-        videos = video_crud.get_videos_by_user(db, user_id)
+        # 一覧に出す列とフィードバック有無だけを新しい順に取る
+        videos = await video_crud.get_video_cards(db, user_id)
         if not videos:
             return {
                 "total_videos": 0,
@@ -236,72 +245,48 @@ def get_user_videos_summary(
                 "recent_videos": []
             }
 
-        # クラブ別にグループ化
+        # クラブ別にグループ化（各動画の dict は 1 回だけ作り、最近の動画と共有する）
+        items = []
         videos_by_club = {}
         for video in videos:
             club = video.club_type or "未分類"
             if club not in videos_by_club:
                 videos_by_club[club] = []
             
-            # サムネイルURLの検証とログ
             thumbnail_info = {
                 "video_id": str(video.video_id),
                 "thumbnail_url": video.thumbnail_url,
                 "upload_date": video.upload_date,
                 "club_type": video.club_type,
                 "swing_form": video.swing_form,
-                "has_feedback": bool(video.section_groups)
+                "has_feedback": bool(video.has_feedback)
             }
             
-            # サムネイルURLの詳細ログ（最初の5件のみ）
-            if len(videos_by_club.get(club, [])) < 5:
-                print(f"サムネイルURL詳細 - Video {video.video_id}: {video.thumbnail_url}")
-                if video.thumbnail_url:
-                    try:
-                        from urllib.parse import urlparse
-                        parsed = urlparse(video.thumbnail_url)
-                        print(f"  - プロトコル: {parsed.scheme}")
-                        print(f"  - ホスト: {parsed.netloc}")
-                        print(f"  - パス: {parsed.path}")
-                        print(f"  - 長さ: {len(video.thumbnail_url)}")
-                    except Exception as e:
-                        print(f"  - URL解析エラー: {e}")
-                else:
-                    print("  - サムネイルURLなし")
+            # サムネイルURLの詳細ログ（最初の5件のみ。DEBUG が無効なら引数の整形もしない）
+            if len(videos_by_club[club]) < 5:
+                logger.debug("サムネイルURL詳細 - Video %s: %s", video.video_id, video.thumbnail_url)
             
             videos_by_club[club].append(thumbnail_info)
+            items.append(thumbnail_info)
 
-        # 最新の動画（最大5件）
-        recent_videos = sorted(
-            [v for v in videos if v.upload_date],
-            key=lambda x: x.upload_date,
-            reverse=True
-        )[:5]
+        # 最新の動画（最大5件）。SQL で新しい順に並んでいるので先頭を取るだけ
+        # （upload_date が NULL の行は従来どおり除く）
+        recent_videos = list(islice((item for item in items if item["upload_date"]), 5))
 
         return {
             "total_videos": len(videos),
             "videos_by_club": videos_by_club,
-            "recent_videos": [
-                {
-                    "video_id": str(v.video_id),
-                    "thumbnail_url": v.thumbnail_url,
-                    "upload_date": v.upload_date,
-                    "club_type": v.club_type,
-                    "swing_form": v.swing_form,
-                    "has_feedback": bool(v.section_groups)
-                }
-                for v in recent_videos
-            ]
+            "recent_videos": recent_videos
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"ユーザー動画サマリーの取得に失敗しました: {str(e)}")
 
 # --- セッション作成 ---
 @router.post("/video/{video_id}/session", response_model=CoachingSessionResponse)
-def create_session(
+async def create_session(
     video_id: UUID,
     payload: CoachingSessionCreate,
-    db: Session = Depends(get_database),
+    db: AsyncSession = Depends(get_database),
 ):
     """
     Create a new coaching session request for a video
@@ -313,8 +298,8 @@ def create_session(
             coach_id=payload.coach_id,
         )
         db.add(new_session)
-        db.commit()
-        db.refresh(new_session)
+        await db.commit()
+        await db.refresh(new_session)
         return new_session
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"セッション作成に失敗しました: {str(e)}")
@@ -322,15 +307,15 @@ def create_session(
 
 # --- 動画に紐づくセッション一覧 ---
 @router.get("/video/{video_id}/sessions", response_model=List[CoachingSessionResponse])
-def list_sessions_for_video(
+async def list_sessions_for_video(
     video_id: UUID,
-    db: Session = Depends(get_database),
+    db: AsyncSession = Depends(get_database),
 ):
     """
     Get all coaching sessions for a specific video
     """
     try:
-        result = db.execute(
+        result = await db.execute(
             select(models.CoachingSession).where(models.CoachingSession.video_id == video_id)
         )
         return result.scalars().all()
@@ -340,14 +325,14 @@ def list_sessions_for_video(
 
 # --- セッション詳細 ---
 @router.get("/session/{session_id}", response_model=CoachingSessionResponse)
-def get_session(
+async def get_session(
     session_id: str,  # UUIDからstr型に変更
-    db: Session = Depends(get_database),
+    db: AsyncSession = Depends(get_database),
 ):
     """
     Get details of a specific session
     """
-    session = db.get(models.CoachingSession, session_id)
+    session = await db.get(models.CoachingSession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="セッションが見つかりません")
     return session
@@ -355,39 +340,39 @@ def get_session(
 
 # --- セッション更新 ---
 @router.put("/session/{session_id}", response_model=CoachingSessionResponse)
-def update_session(
+async def update_session(
     session_id: str,  # UUIDからstr型に変更
     payload: CoachingSessionUpdate,
-    db: Session = Depends(get_database),
+    db: AsyncSession = Depends(get_database),
 ):
     """
     Update session status or info
     """
-    session = db.get(models.CoachingSession, session_id)
+    session = await db.get(models.CoachingSession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="セッションが見つかりません")
 
     for key, value in payload.dict(exclude_unset=True).items():
         setattr(session, key, value)
 
-    db.commit()
-    db.refresh(session)
+    await db.commit()
+    await db.refresh(session)
     return session
 
 
 # --- セッション削除 (任意) ---
 @router.delete("/session/{session_id}")
-def delete_session(
+async def delete_session(
     session_id: str,  # UUIDからstr型に変更
-    db: Session = Depends(get_database),
+    db: AsyncSession = Depends(get_database),
 ):
     """
     Delete a coaching session (if allowed)
     """
-    session = db.get(models.CoachingSession, session_id)
+    session = await db.get(models.CoachingSession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="セッションが見つかりません")
 
-    db.delete(session)
-    db.commit()
+    await db.delete(session)
+    await db.commit()
     return {"message": "セッションを削除しました"}
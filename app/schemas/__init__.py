@@ -17,7 +17,7 @@ from .section import (
 # --- Video ---
 from .video import (
     VideoBase, VideoCreate, VideoUpdate, VideoResponse, VideoUploadRequest,
-    VideoWithSectionsResponse,
+    VideoWithSectionsResponse, video_list_adapter, dump_video_list_json,
 )
 
 # --- Reservation ---
@@ -45,7 +45,7 @@ __all__ = [
     "OverallFeedbackRequest", "OverallFeedbackResponse",
     # Video
     "VideoBase", "VideoCreate", "VideoUpdate", "VideoResponse", "VideoUploadRequest",
-    "VideoWithSectionsResponse",
+    "VideoWithSectionsResponse", "video_list_adapter", "dump_video_list_json",
     # Reservation
     "CoachingReservationBase", "CoachingReservationCreate",
     "CoachingReservationUpdate", "CoachingReservationResponse",
@@ -1,20 +0,0 @@
-from .common import (
-    LocationType, ReservationStatus, PaymentStatus, SwingSectionTag,
-    MarkupObject, ErrorResponse,
-)
-from .user import UserCreate, UserUpdate, UserResponse, UserMini
-from .coach import CoachCreate, CoachUpdate, CoachResponse, CoachOut
-from .section import (
-    SectionGroupBase, SectionGroupCreate, SectionGroupResponse,
-    SwingSectionBase, SwingSectionCreate, SwingSectionUpdate, SwingSectionResponse,
-    CoachCommentRequest, CoachCommentResponse,
-    OverallFeedbackRequest, OverallFeedbackResponse,
-)
-from .reservation import (
-    CoachingReservationBase, CoachingReservationCreate,
-    CoachingReservationUpdate, CoachingReservationResponse,
-)
-from .video import (
-    VideoBase, VideoCreate, VideoUpdate, VideoResponse,
-    VideoUploadRequest, VideoWithSectionsResponse,
-)
@@ -1,5 +1,5 @@
 # app/schemas/video.py
-from pydantic import BaseModel, Field, field_serializer
+from pydantic import BaseModel, Field, TypeAdapter, field_serializer
 from typing import Optional, List
 from datetime import datetime
 from uuid import UUID
@@ -57,6 +57,17 @@ class VideoResponse(VideoBase):
     model_config = {"from_attributes": True}
 
 
+# List[VideoResponse] の検証・JSON 化用（構築が重いのでモジュールで 1 回だけ作る）
+video_list_adapter = TypeAdapter(List[VideoResponse])
+
+
+def dump_video_list_json(videos) -> bytes:
+    """ORM の Video リストを VideoResponse の JSON（bytes）へ 1 回で変換する"""
+    return video_list_adapter.dump_json(
+        video_list_adapter.validate_python(videos, from_attributes=True), by_alias=True
+    )
+
+
 class VideoUploadRequest(BaseModel):
     club_type: Optional[str] = None
     swing_form: Optional[str] = Field(None, alias="swing_type")
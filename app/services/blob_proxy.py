@@ -0,0 +1,78 @@
+# app/services/blob_proxy.py
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+import httpx
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+# 1 回に読み書きするチャンクサイズ（動画全体をメモリに載せない）
+CHUNK_SIZE = 64 * 1024
+
+# プロセス内で共有する HTTP クライアント（Blob への keep-alive 接続を使い回す）
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """共有クライアントを返す（起動時に作られていなければここで作る）"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, read=None),
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=50, keepalive_expiry=60),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """アプリ終了時に共有クライアントを閉じる"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def stream_blob(
+    sas_url: str,
+    headers: Dict[str, str],
+    *,
+    error_status: Optional[int] = None,
+    error_detail: str = "ファイルの取得に失敗しました",
+) -> StreamingResponse:
+    """SAS URL の中身を受け取った順にクライアントへ流す StreamingResponse を返す。
+
+    共有クライアントを使うので、同じホストへの 2 回目以降は TCP/TLS の確立を省ける。
+    上流が 200 以外なら error_status（未指定なら上流のステータス）で HTTPException を送出する。
+    """
+    client = get_http_client()
+    upstream = await client.send(client.build_request("GET", sas_url), stream=True)
+
+    async def close() -> None:
+        # 接続はプールへ返すだけで、クライアント自体は閉じない
+        await upstream.aclose()
+
+    if upstream.status_code != 200:
+        await close()
+        raise HTTPException(status_code=error_status or upstream.status_code, detail=error_detail)
+
+    async def body():
+        try:
+            async for chunk in upstream.aiter_raw(CHUNK_SIZE):
+                yield chunk
+        finally:
+            await close()
+
+    response_headers = dict(headers)
+    # aiter_raw はエンコードを解かずに流すので、長さとエンコーディングはそのまま引き継ぐ
+    for name in ("content-length", "content-encoding"):
+        if name in upstream.headers:
+            response_headers[name] = upstream.headers[name]
+
+    return StreamingResponse(
+        body(),
+        media_type=upstream.headers.get("content-type", "application/octet-stream"),
+        headers=response_headers,
+        background=BackgroundTask(close),
+    )
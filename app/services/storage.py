@@ -2,22 +2,28 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import BinaryIO, Optional, List, Dict, Any
+from typing import BinaryIO, Optional, List, Dict, Any, Union
 import os
 import shutil
 from pathlib import Path
 import uuid
 from datetime import datetime, timezone, timedelta
-from urllib.parse import urlparse, unquote
-import json
+from urllib.parse import urlparse, urlsplit, unquote
+import orjson
 
 from concurrent.futures import ThreadPoolExecutor
+import threading
+from functools import lru_cache
+
 from azure.storage.blob import (
     BlobServiceClient,
     BlobClient,
+    BlobSasPermissions,
     ContainerClient,
     ContentSettings,
+    generate_blob_sas,
 )
+from cachetools import LRUCache
 
 from dotenv import load_dotenv
 
@@ -27,16 +33,19 @@ load_dotenv()
 # ==============================
 # Storage Interfaces
 # ==============================
+# アップロード対象：ファイルオブジェクト、またはメモリ上のバイト列（BytesIO で包まずにそのまま渡せる）
+FileData = Union[bytes, BinaryIO]
+
 class StorageInterface(ABC):
     """Abstract interface for storage operations"""
 
     @abstractmethod
-    def upload_file(self, file: BinaryIO, filename: str, content_type: Optional[str] = None) -> str:
+    def upload_file(self, file: FileData, filename: str, content_type: Optional[str] = None) -> str:
         """Upload a file and return the URL"""
         raise NotImplementedError
 
     @abstractmethod
-    def upload_file_with_exact_name(self, file: BinaryIO, exact_filename: str, content_type: Optional[str] = None) -> str:
+    def upload_file_with_exact_name(self, file: FileData, exact_filename: str, content_type: Optional[str] = None) -> str:
         """Upload a file with exact filename (no modifications) and return the URL"""
         raise NotImplementedError
 
@@ -67,6 +76,14 @@ class StorageInterface(ABC):
 # ==============================
 # Local Storage Implementation
 # ==============================
+def _write_local(file_path: Path, file: FileData) -> None:
+    with open(file_path, "wb") as buffer:
+        if isinstance(file, (bytes, bytearray, memoryview)):
+            buffer.write(file)
+        else:
+            shutil.copyfileobj(file, buffer)
+
+
 class LocalStorage(StorageInterface):
     """Local file storage implementation"""
 
@@ -75,7 +92,7 @@ class LocalStorage(StorageInterface):
         self.storage_path.mkdir(parents=True, exist_ok=True)
         self.base_url = "/uploads"  # Next.js のリバースプロキシ想定
 
-    def upload_file(self, file: BinaryIO, filename: str, content_type: Optional[str] = None) -> str:
+    def upload_file(self, file: FileData, filename: str, content_type: Optional[str] = None) -> str:
         """Upload file to local storage"""
         file_extension = Path(filename).suffix
         jst = timezone(timedelta(hours=9))
@@ -84,16 +101,14 @@ class LocalStorage(StorageInterface):
         unique_filename = f"{timestamp}_U99999{file_extension}"
 
         file_path = self.storage_path / unique_filename
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file, buffer)
+        _write_local(file_path, file)
 
         return f"{self.base_url}/{unique_filename}"
 
-    def upload_file_with_exact_name(self, file: BinaryIO, exact_filename: str, content_type: Optional[str] = None) -> str:
+    def upload_file_with_exact_name(self, file: FileData, exact_filename: str, content_type: Optional[str] = None) -> str:
         """Upload file to local storage with exact filename"""
         file_path = self.storage_path / exact_filename
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file, buffer)
+        _write_local(file_path, file)
         return f"{self.base_url}/{exact_filename}"
 
     def delete_file(self, file_url_or_path: str) -> bool:
@@ -120,8 +135,7 @@ class LocalStorage(StorageInterface):
         """Save dict as JSON file locally"""
         target = self.storage_path / blob_path
         target.parent.mkdir(parents=True, exist_ok=True)
-        with open(target, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False)
+        target.write_bytes(orjson.dumps(data))
         return self.get_file_url(blob_path)
 
     def get_json(self, blob_path: str) -> Optional[Dict[str, Any]]:
@@ -129,8 +143,7 @@ class LocalStorage(StorageInterface):
         if not target.exists():
             return None
         try:
-            with open(target, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return orjson.loads(target.read_bytes())
         except Exception:
             return None
 
@@ -156,6 +169,10 @@ class LocalStorage(StorageInterface):
 # ==============================
 # Azure Blob Storage Implementation
 # ==============================
+# 大きなファイル（single put の上限超え）はブロックに分けて並列に stage_block → commit_block_list される
+_UPLOAD_CONCURRENCY = 4
+
+
 class AzureBlobStorage(StorageInterface):
     """Azure Blob Storage implementation"""
 
@@ -197,7 +214,7 @@ class AzureBlobStorage(StorageInterface):
         return path.split("/", 1)[-1]
 
     # ---------- core ops ----------
-    def upload_file(self, file: BinaryIO, filename: str, content_type: Optional[str] = None) -> str:
+    def upload_file(self, file: FileData, filename: str, content_type: Optional[str] = None) -> str:
         """Upload file to Azure Blob Storage with unique name"""
         file_extension = Path(filename).suffix
         jst = timezone(timedelta(hours=9))
@@ -211,10 +228,11 @@ class AzureBlobStorage(StorageInterface):
             file,
             content_settings=ContentSettings(content_type=content_type) if content_type else None,
             overwrite=True,
+            max_concurrency=_UPLOAD_CONCURRENCY,
         )
         return blob_client.url
 
-    def upload_file_with_exact_name(self, file: BinaryIO, exact_filename: str, content_type: Optional[str] = None) -> str:
+    def upload_file_with_exact_name(self, file: FileData, exact_filename: str, content_type: Optional[str] = None) -> str:
         """Upload file to Azure Blob Storage with exact filename"""
         blob_client = self._blob_client(exact_filename)
 
@@ -222,6 +240,7 @@ class AzureBlobStorage(StorageInterface):
             file,
             content_settings=ContentSettings(content_type=content_type) if content_type else None,
             overwrite=True,
+            max_concurrency=_UPLOAD_CONCURRENCY,
         )
         return blob_client.url
 
@@ -252,7 +271,7 @@ class AzureBlobStorage(StorageInterface):
         Save dict as JSON blob (UTF-8).
         Returns public (non-SAS) blob URL.
         """
-        payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        payload = orjson.dumps(data)  # UTF-8 のまま出力（ensure_ascii=False 相当）
         blob_client = self._blob_client(blob_path)
 
         blob_client.upload_blob(
@@ -268,7 +287,7 @@ class AzureBlobStorage(StorageInterface):
         try:
             stream = blob_client.download_blob()
             raw = stream.readall()
-            return json.loads(raw.decode("utf-8"))
+            return orjson.loads(raw)
         except Exception:
             return None
 
@@ -287,6 +306,65 @@ class AzureBlobStorage(StorageInterface):
             self.executor.shutdown(wait=False)
 
 
+# ==============================
+# SAS URL helpers
+# ==============================
+# 残り有効期間がこれを下回った SAS は使い回さずに発行し直す
+_SAS_REUSE_MARGIN = timedelta(minutes=5)
+_sas_cache: LRUCache = LRUCache(maxsize=4096)
+_sas_lock = threading.Lock()
+
+
+@lru_cache(maxsize=4096)
+def blob_name_from_url(blob_url: str) -> str:
+    """Blob URL からコンテナ配下の blob 名を取り出す（クエリ/SAS は無視）。
+
+    https://{account}.blob.core.windows.net/{container}/{path...} -> {path...}
+    URL でない文字列は既に blob 名とみなしてそのまま返す。
+    """
+    if "://" not in blob_url:
+        return blob_url
+    parts = urlsplit(blob_url).path.lstrip("/").split("/", 1)
+    return parts[1] if len(parts) == 2 else parts[0]
+
+
+@lru_cache(maxsize=4)
+def get_blob_service_client(connection_string: str) -> BlobServiceClient:
+    """接続文字列ごとに BlobServiceClient を 1 つだけ作って使い回す"""
+    return BlobServiceClient.from_connection_string(connection_string)
+
+
+def generate_read_sas_url(
+    connection_string: str, container_name: str, blob_name: str, lifetime: timedelta
+) -> str:
+    """読み取り専用の SAS 付き URL を返す。
+
+    同じ blob への要求には、残り有効期間が十分ある間は発行済みの URL を返す
+    （HMAC 署名と接続文字列のパースを毎回行わない）。
+    """
+    key = (connection_string, container_name, blob_name, lifetime)
+    now = datetime.now(timezone.utc)
+    with _sas_lock:
+        cached = _sas_cache.get(key)
+    if cached is not None and cached[1] - now > _SAS_REUSE_MARGIN:
+        return cached[0]
+
+    client = get_blob_service_client(connection_string)
+    expiry = now + lifetime
+    sas_token = generate_blob_sas(
+        account_name=client.account_name,
+        container_name=container_name,
+        blob_name=blob_name,
+        account_key=client.credential.account_key,
+        permission=BlobSasPermissions(read=True),
+        expiry=expiry,
+    )
+    sas_url = f"https://{client.account_name}.blob.core.windows.net/{container_name}/{blob_name}?{sas_token}"
+    with _sas_lock:
+        _sas_cache[key] = (sas_url, expiry)
+    return sas_url
+
+
 # ==============================
 # Storage Service Facade
 # ==============================
@@ -304,13 +382,13 @@ class StorageService:
             self.storage = LocalStorage(storage_path)
 
     # ---- Common wrappers (existing API) ----
-    def upload_video(self, file: BinaryIO, filename: str) -> str:
+    def upload_video(self, file: FileData, filename: str) -> str:
         return self.storage.upload_file(file, filename, "video/mp4")
 
-    def upload_image(self, file: BinaryIO, filename: str) -> str:
+    def upload_image(self, file: FileData, filename: str) -> str:
         return self.storage.upload_file(file, filename, "image/jpeg")
 
-    def upload_image_with_exact_name(self, file: BinaryIO, exact_filename: str) -> str:
+    def upload_image_with_exact_name(self, file: FileData, exact_filename: str) -> str:
         return self.storage.upload_file_with_exact_name(file, exact_filename, "image/jpeg")
 
     def delete_file(self, file_url_or_path: str) -> bool:
@@ -31,4 +31,13 @@ def now_jst() -> datetime:
     Returns:
         現在の日本時間のdatetimeオブジェクト
     """
-    return datetime.now(JST)
\ No newline at end of file
+    return datetime.now(JST)
+
+def now_utc() -> datetime:
+    """
+    現在の UTC 日時を取得する（モデルの日時列の既定値など、Python 側で入れる日時はこれに揃える）
+    
+    Returns:
+        tz 付き UTC のdatetimeオブジェクト
+    """
+    return datetime.now(timezone.utc)
\ No newline at end of file
@@ -0,0 +1,97 @@
+-- UUID 列を CHAR(36) から BINARY(16) に変換するSQLスクリプト
+-- app/models.py の GUID 型（MySQL では BINARY(16) で保存）に合わせます。既存DBに対して一度だけ実行してください
+-- 実行前に必ずバックアップを取得してください（例: mysqldump）
+
+-- 各列は 3 段階で変換します:
+--   1) VARBINARY(36) に変更（文字列のまま保持）
+--   2) UNHEX(REPLACE(col, '-', '')) で 16 バイトへ変換
+--   3) BINARY(16) に変更
+-- 外部キーで結ばれた列は全て同じスクリプト内で変換するため、作業中だけチェックを無効にします
+
+SET FOREIGN_KEY_CHECKS = 0;
+
+-- 1. users
+ALTER TABLE users MODIFY user_id VARBINARY(36) NOT NULL;
+UPDATE users SET user_id = UNHEX(REPLACE(user_id, '-', ''));
+ALTER TABLE users MODIFY user_id BINARY(16) NOT NULL;
+
+-- 2. coaches
+ALTER TABLE coaches MODIFY coach_id VARBINARY(36) NOT NULL;
+UPDATE coaches SET coach_id = UNHEX(REPLACE(coach_id, '-', ''));
+ALTER TABLE coaches MODIFY coach_id BINARY(16) NOT NULL;
+
+-- 3. videos
+ALTER TABLE videos
+    MODIFY video_id VARBINARY(36) NOT NULL,
+    MODIFY user_id VARBINARY(36) NOT NULL,
+    MODIFY section_group_id VARBINARY(36) NULL;
+UPDATE videos SET
+    video_id = UNHEX(REPLACE(video_id, '-', '')),
+    user_id = UNHEX(REPLACE(user_id, '-', '')),
+    section_group_id = UNHEX(REPLACE(section_group_id, '-', ''));
+ALTER TABLE videos
+    MODIFY video_id BINARY(16) NOT NULL,
+    MODIFY user_id BINARY(16) NOT NULL,
+    MODIFY section_group_id BINARY(16) NULL;
+
+-- 4. coaching_sessions
+ALTER TABLE coaching_sessions
+    MODIFY session_id VARBINARY(36) NOT NULL,
+    MODIFY user_id VARBINARY(36) NOT NULL,
+    MODIFY coach_id VARBINARY(36) NOT NULL,
+    MODIFY video_id VARBINARY(36) NOT NULL;
+UPDATE coaching_sessions SET
+    session_id = UNHEX(REPLACE(session_id, '-', '')),
+    user_id = UNHEX(REPLACE(user_id, '-', '')),
+    coach_id = UNHEX(REPLACE(coach_id, '-', '')),
+    video_id = UNHEX(REPLACE(video_id, '-', ''));
+ALTER TABLE coaching_sessions
+    MODIFY session_id BINARY(16) NOT NULL,
+    MODIFY user_id BINARY(16) NOT NULL,
+    MODIFY coach_id BINARY(16) NOT NULL,
+    MODIFY video_id BINARY(16) NOT NULL;
+
+-- 5. coaching_reservation（location_id も GUID 型。locations.location_id は文字列のまま）
+ALTER TABLE coaching_reservation
+    MODIFY session_id VARBINARY(36) NOT NULL,
+    MODIFY user_id VARBINARY(36) NOT NULL,
+    MODIFY coach_id VARBINARY(36) NOT NULL,
+    MODIFY location_id VARBINARY(36) NOT NULL;
+UPDATE coaching_reservation SET
+    session_id = UNHEX(REPLACE(session_id, '-', '')),
+    user_id = UNHEX(REPLACE(user_id, '-', '')),
+    coach_id = UNHEX(REPLACE(coach_id, '-', '')),
+    location_id = UNHEX(REPLACE(location_id, '-', ''));
+ALTER TABLE coaching_reservation
+    MODIFY session_id BINARY(16) NOT NULL,
+    MODIFY user_id BINARY(16) NOT NULL,
+    MODIFY coach_id BINARY(16) NOT NULL,
+    MODIFY location_id BINARY(16) NOT NULL;
+
+-- 6. section_groups（session_id は VARCHAR(255) のまま）
+ALTER TABLE section_groups
+    MODIFY section_group_id VARBINARY(36) NOT NULL,
+    MODIFY video_id VARBINARY(36) NOT NULL;
+UPDATE section_groups SET
+    section_group_id = UNHEX(REPLACE(section_group_id, '-', '')),
+    video_id = UNHEX(REPLACE(video_id, '-', ''));
+ALTER TABLE section_groups
+    MODIFY section_group_id BINARY(16) NOT NULL,
+    MODIFY video_id BINARY(16) NOT NULL;
+
+-- 7. swing_sections
+ALTER TABLE swing_sections
+    MODIFY section_id VARBINARY(36) NOT NULL,
+    MODIFY section_group_id VARBINARY(36) NOT NULL;
+UPDATE swing_sections SET
+    section_id = UNHEX(REPLACE(section_id, '-', '')),
+    section_group_id = UNHEX(REPLACE(section_group_id, '-', ''));
+ALTER TABLE swing_sections
+    MODIFY section_id BINARY(16) NOT NULL,
+    MODIFY section_group_id BINARY(16) NOT NULL;
+
+SET FOREIGN_KEY_CHECKS = 1;
+
+-- 確認（HEX で表示）
+SELECT HEX(user_id) FROM users LIMIT 5;
+DESCRIBE videos;